@@ -0,0 +1,165 @@
+import math
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, List
+from config import Config
+from tracing import tracer
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Requisição recusada porque a faixa de admissão está cheia"""
+
+    def __init__(self, lane: str, retry_after: int, reason: str):
+        super().__init__(f"Faixa '{lane}' cheia ({reason})")
+        self.lane = lane
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class Lane:
+    """Faixa de admissão com limite de concorrência e fila limitada"""
+
+    def __init__(self, name: str, max_chars: float, max_concurrent: int, max_queue: int,
+                 queue_timeout: float):
+        self.name = name
+        self.max_chars = max_chars
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.avg_duration = 1.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """Ocupa uma vaga na faixa, aguardando na fila se necessário"""
+        with self._condition:
+            if self.active >= self.max_concurrent:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    raise AdmissionRejected(self.name, self.retry_after(), 'fila cheia')
+
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self.active < self.max_concurrent, timeout=self.queue_timeout
+                    )
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.timed_out += 1
+                    raise AdmissionRejected(self.name, self.retry_after(), 'tempo de espera esgotado')
+
+            self.active += 1
+            self.admitted += 1
+            return time.time()
+
+    def release(self, started_at: float = None):
+        """Libera a vaga e atualiza a média de duração da faixa"""
+        with self._condition:
+            self.active -= 1
+            if started_at is not None:
+                # Média móvel exponencial, usada para estimar o Retry-After
+                self.avg_duration = 0.8 * self.avg_duration + 0.2 * (time.time() - started_at)
+            self._condition.notify()
+
+    def retry_after(self) -> int:
+        """Estima em quantos segundos a faixa terá vaga"""
+        backlog = (self.waiting + 1) / self.max_concurrent
+        return max(1, math.ceil(backlog * self.avg_duration))
+
+    def stats(self) -> Dict:
+        """Retorna métricas da faixa (profundidade da fila, rejeições, etc.)"""
+        with self._condition:
+            return {
+                'max_chars': None if math.isinf(self.max_chars) else self.max_chars,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self.active,
+                'queue_depth': self.waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'avg_duration': round(self.avg_duration, 3)
+            }
+
+
+class AdmissionController:
+    """Distribui requisições em faixas (small, medium, large) pelo tamanho do texto"""
+
+    def __init__(self, lanes: List[Lane] = None, thread_budget: int = None):
+        self.lanes = sorted(lanes or self._default_lanes(), key=lambda lane: lane.max_chars)
+        if thread_budget is None:
+            thread_budget = Config.WORKER_THREADS - Config.ADMISSION_RESERVED_THREADS
+        self._fit_to_threads(max(len(self.lanes), thread_budget))
+
+    def _fit_to_threads(self, budget: int):
+        """Reduz filas e concorrência até que todas as faixas caibam nas threads do worker
+
+        Uma requisição na fila ainda ocupa uma thread do gthread; se a soma passar
+        das threads, a fila de uma faixa nunca enche e o 429 dela não acontece.
+        """
+        def total():
+            return sum(lane.max_concurrent + lane.max_queue for lane in self.lanes)
+
+        if total() <= budget:
+            return
+        requested = total()
+        # Primeiro as filas, depois a concorrência, sempre da faixa que mais ocupa
+        for attribute, minimum in (('max_queue', 0), ('max_concurrent', 1)):
+            while total() > budget:
+                candidates = [lane for lane in self.lanes if getattr(lane, attribute) > minimum]
+                if not candidates:
+                    break
+                lane = max(candidates, key=lambda lane: getattr(lane, attribute))
+                setattr(lane, attribute, getattr(lane, attribute) - 1)
+        logger.warning(
+            f"Faixas de admissão pediam {requested} threads, mas o worker tem {budget} disponíveis; "
+            f"limites ajustados: " + ', '.join(
+                f"{lane.name}={lane.max_concurrent}+{lane.max_queue}" for lane in self.lanes
+            )
+        )
+
+    @staticmethod
+    def _default_lanes() -> List[Lane]:
+        return [
+            Lane('small', Config.ADMISSION_SMALL_MAX_CHARS,
+                 Config.ADMISSION_SMALL_CONCURRENCY, Config.ADMISSION_SMALL_QUEUE,
+                 Config.ADMISSION_QUEUE_TIMEOUT),
+            Lane('medium', Config.ADMISSION_MEDIUM_MAX_CHARS,
+                 Config.ADMISSION_MEDIUM_CONCURRENCY, Config.ADMISSION_MEDIUM_QUEUE,
+                 Config.ADMISSION_QUEUE_TIMEOUT),
+            Lane('large', math.inf,
+                 Config.ADMISSION_LARGE_CONCURRENCY, Config.ADMISSION_LARGE_QUEUE,
+                 Config.ADMISSION_QUEUE_TIMEOUT)
+        ]
+
+    def lane_for(self, size: int) -> Lane:
+        """Retorna a faixa correspondente ao tamanho (em caracteres)"""
+        for lane in self.lanes:
+            if size <= lane.max_chars:
+                return lane
+        return self.lanes[-1]
+
+    @contextmanager
+    def admit(self, size: int):
+        """Executa o bloco dentro da faixa adequada, ou levanta AdmissionRejected"""
+        lane = self.lane_for(size)
+        with tracer.span('admission_wait', lane=lane.name):
+            started_at = lane.acquire()
+        try:
+            yield lane
+        finally:
+            lane.release(started_at)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Retorna as métricas de todas as faixas"""
+        return {lane.name: lane.stats() for lane in self.lanes}
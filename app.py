@@ -1,20 +1,47 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, stream_with_context, g, has_request_context
+from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.wsgi import LimitedStream
+from werkzeug.middleware.proxy_fix import ProxyFix
+from functools import wraps
+import io
 import os
+import codecs
+import hmac
 import json
+import random
+import threading
+import uuid
 import logging
 from datetime import datetime
 from translator_service import TechnicalTranslator
+from catalogs import collect_strings, replace_strings, parse_po, render_po, po_untranslated, po_source_strings, po_apply_translations
+from compression import (
+    DecompressingStream, DecompressionError, available_encodings, choose_encoding,
+    compress_response, decompress_body, is_supported_request_encoding, should_compress
+)
+from admission import AdmissionController, AdmissionRejected
+from segments import SegmentStore, SegmentCache, RateLimiter, RateLimited
+from tracing import tracer, RequestIdFilter
+from profiling import SamplingProfiler, ProfileStore, render_flame_graph, PROFILE_ID_PATTERN
 from config import Config
 
 # Configuração de logging básico
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
 )
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter(
+        fallback=lambda: g.get('request_id') if has_request_context() else None
+    ))
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config.from_object(Config)
+if Config.TRUSTED_PROXIES:
+    # request.remote_addr passa a ser o cliente real, não o proxy
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXIES, x_proto=Config.TRUSTED_PROXIES)
 
 # Validação de configuração na inicialização
 try:
@@ -32,11 +59,170 @@ try:
 except Exception as e:
     logger.error(f"❌ Erro ao inicializar tradutor: {e}")
 
+profile_store = ProfileStore()
+admission = AdmissionController()
+segment_store = SegmentStore()
+segment_cache = SegmentCache(segment_store)
+segment_rate_limiter = RateLimiter(segment_store)
+
 @app.route('/')
 def index():
     """Main page with translation interface"""
     return render_template('index.html')
 
+@app.before_request
+def assign_request_id():
+    """Assign the request id, taken from X-Request-ID or generated"""
+    header_id = request.headers.get('X-Request-ID', '')
+    g.request_id = header_id if PROFILE_ID_PATTERN.match(header_id) else uuid.uuid4().hex
+
+def _get_request_id():
+    """Return the current request id"""
+    return g.request_id
+
+@app.after_request
+def add_request_id_header(response):
+    """Echo the request id back to the client"""
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@app.before_request
+def decompress_request_body():
+    """Transparently decompress request bodies sent with Content-Encoding"""
+    encoding = request.headers.get('Content-Encoding', '').strip().lower()
+    if not encoding or encoding == 'identity':
+        return None
+    
+    if not is_supported_request_encoding(encoding):
+        logger.warning(f"Content-Encoding não suportado: {encoding}")
+        return jsonify({
+            'error': f'Content-Encoding não suportado: {encoding}',
+            'error_code': 'UNSUPPORTED_CONTENT_ENCODING',
+            'supported_encodings': available_encodings()
+        }), 415
+    
+    environ = request.environ
+    raw = environ['wsgi.input']
+    if environ.get('CONTENT_LENGTH'):
+        raw = LimitedStream(raw, int(environ['CONTENT_LENGTH']))
+    
+    if request.endpoint == 'translate_file':
+        # Uploads grandes são descomprimidos sob demanda, durante a leitura
+        g.decompressing_stream = DecompressingStream(raw, encoding, Config.MAX_UPLOAD_SIZE)
+        environ['wsgi.input'] = io.BufferedReader(g.decompressing_stream)
+        environ.pop('CONTENT_LENGTH', None)
+        environ['wsgi.input_terminated'] = True
+    else:
+        try:
+            body = decompress_body(raw, encoding, Config.MAX_DECOMPRESSED_SIZE)
+        except DecompressionError as e:
+            logger.warning(f"Erro ao descomprimir requisição: {e}")
+            return jsonify({'error': str(e), 'error_code': 'INVALID_CONTENT_ENCODING'}), 400
+        environ['wsgi.input'] = io.BytesIO(body)
+        environ['CONTENT_LENGTH'] = str(len(body))
+    environ.pop('HTTP_CONTENT_ENCODING', None)
+    return None
+
+@app.after_request
+def compress_response_body(response):
+    """Compress responses the client accepts, skipping tiny and streamed ones"""
+    if should_compress(response):
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding:
+            compress_response(response, encoding)
+    return response
+
+def _cacheable(response):
+    """Mark a response as publicly cacheable, with a weak ETag for revalidation"""
+    response.cache_control.public = True
+    response.cache_control.max_age = Config.CACHEABLE_MAX_AGE
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+def _is_admin_request():
+    """Check the X-Admin-Token header against the configured admin token"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+def require_admin(view):
+    """Restrict an endpoint to requests carrying the admin token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _is_admin_request():
+            logger.warning(f"Acesso administrativo negado: {request.path}")
+            return jsonify({'error': 'Acesso não autorizado', 'error_code': 'FORBIDDEN'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def _should_profile():
+    """Decide whether to profile this request (admin flag or random sampling)"""
+    if request.args.get('profile') or request.headers.get('X-Profile'):
+        return _is_admin_request()
+    return Config.PROFILING_SAMPLE_RATE > 0 and random.random() < Config.PROFILING_SAMPLE_RATE
+
+def _admission_rejected_response(error):
+    """Build a 429 response with Retry-After for a rejected request"""
+    return jsonify({
+        'error': 'Servidor ocupado. Tente novamente em instantes.',
+        'error_code': 'TOO_MANY_REQUESTS',
+        'lane': error.lane,
+        'retry_after': error.retry_after
+    }), 429, {'Retry-After': str(error.retry_after)}
+
+def _validate_languages(source_lang, target_lang):
+    """Return an error response if the language pair is not supported"""
+    supported_langs = translator.get_supported_languages()
+    if source_lang != 'auto' and source_lang not in supported_langs:
+        logger.warning(f"Idioma de origem não suportado: {source_lang}")
+        return jsonify({
+            'error': f'Idioma de origem não suportado: {source_lang}',
+            'error_code': 'INVALID_SOURCE_LANGUAGE',
+            'supported_languages': list(supported_langs.keys())
+        }), 400
+    
+    if target_lang not in supported_langs:
+        logger.warning(f"Idioma de destino não suportado: {target_lang}")
+        return jsonify({
+            'error': f'Idioma de destino não suportado: {target_lang}',
+            'error_code': 'INVALID_TARGET_LANGUAGE',
+            'supported_languages': list(supported_langs.keys())
+        }), 400
+    
+    return None
+
+# Linha adicionada ao fim de /translate/file quando a tradução falha depois do status 200
+FILE_STREAM_ERROR_MARKER = '[[TRADUCAO_INTERROMPIDA]]'
+
+def _stream_error_marker(error_code, request_id):
+    """Trailer appended to a streamed download that stopped early"""
+    return f"\n\n{FILE_STREAM_ERROR_MARKER} {error_code} request_id={request_id}\n"
+
+def _upload_too_large_response():
+    """413 for uploads without Content-Length that pass MAX_UPLOAD_SIZE while being read"""
+    logger.warning(f"Arquivo muito grande: mais de {Config.MAX_UPLOAD_SIZE} bytes")
+    return jsonify({
+        'error': f'Arquivo muito grande. Máximo permitido: {Config.MAX_UPLOAD_SIZE} bytes',
+        'error_code': 'FILE_TOO_LARGE',
+        'max_size': Config.MAX_UPLOAD_SIZE
+    }), 413
+
+def _iter_stream_lines(stream, first_chunk=b''):
+    """Decode an upload stream incrementally, yielding one line at a time"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    pending = ''
+    chunk = first_chunk
+    while chunk:
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        # A última linha pode estar incompleta até o próximo bloco
+        pending = lines.pop() if lines and not lines[-1].endswith('\n') else ''
+        yield from lines
+        chunk = stream.read(Config.UPLOAD_READ_SIZE)
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
 @app.route('/translate', methods=['POST'])
 def translate_article():
     """Translate technical article"""
@@ -81,44 +267,59 @@ def translate_article():
         source_lang = data.get('source_language', Config.DEFAULT_SOURCE_LANGUAGE)
         target_lang = data.get('target_language', Config.DEFAULT_TARGET_LANGUAGE)
         preserve_formatting = data.get('preserve_formatting', True)
+        # Parágrafos já traduzidos pela tradução ao vivo (/translate/segment) são reaproveitados
+        use_segment_cache = bool(data.get('use_segment_cache', False))
         
         # Validação de idiomas suportados
-        supported_langs = translator.get_supported_languages()
-        if source_lang != 'auto' and source_lang not in supported_langs:
-            logger.warning(f"Idioma de origem não suportado: {source_lang}")
-            return jsonify({
-                'error': f'Idioma de origem não suportado: {source_lang}',
-                'error_code': 'INVALID_SOURCE_LANGUAGE',
-                'supported_languages': list(supported_langs.keys())
-            }), 400
-        
-        if target_lang not in supported_langs:
-            logger.warning(f"Idioma de destino não suportado: {target_lang}")
-            return jsonify({
-                'error': f'Idioma de destino não suportado: {target_lang}',
-                'error_code': 'INVALID_TARGET_LANGUAGE',
-                'supported_languages': list(supported_langs.keys())
-            }), 400
+        language_error = _validate_languages(source_lang, target_lang)
+        if language_error:
+            return language_error
         
         # Log da requisição (sem o texto completo para privacidade)
         logger.info(f"Tradução solicitada: {source_lang} -> {target_lang}, tamanho: {len(text)} caracteres")
         
-        # Realiza a tradução
-        result = translator.translate_article(
-            text=text,
-            source_language=source_lang,
-            target_language=target_lang,
-            preserve_formatting=preserve_formatting
-        )
+        with tracer.trace(_get_request_id(), 'POST /translate', chars=len(text)):
+            # Admissão por faixa de tamanho: traduções longas não bloqueiam as curtas
+            with admission.admit(len(text)):
+                # Profiling opcional: sem custo quando não solicitado
+                profiler = None
+                profile_id = None
+                if _should_profile():
+                    profiler = SamplingProfiler(threading.get_ident(), Config.PROFILING_INTERVAL)
+                    profiler.start()
+                
+                # Realiza a tradução
+                try:
+                    result = translator.translate_article(
+                        text=text,
+                        source_language=source_lang,
+                        target_language=target_lang,
+                        preserve_formatting=preserve_formatting,
+                        request_id=_get_request_id(),
+                        segment_cache=segment_cache if use_segment_cache else None
+                    )
+                finally:
+                    if profiler:
+                        profiler.stop()
+                        profile_id = profile_store.save(profiler, request_id=_get_request_id())
         
         logger.info(f"Tradução concluída em {result.get('translation_time', 0)}s")
         
-        return jsonify({
+        response = {
             'translated_text': result['translated_text'],
             'confidence': result.get('confidence', 0),
             'detected_language': result.get('detected_language', source_lang),
             'translation_time': result.get('translation_time', 0)
-        })
+        }
+        if 'segments_reused' in result:
+            response['segments_reused'] = result['segments_reused']
+        if profile_id:
+            response['profile_id'] = profile_id
+        return jsonify(response)
+        
+    except AdmissionRejected as e:
+        logger.warning(f"Requisição recusada pela admissão: {e}")
+        return _admission_rejected_response(e)
         
     except ValueError as e:
         # Erros de validação
@@ -137,15 +338,382 @@ def translate_article():
             'message': str(e) if app.config.get('FLASK_ENV') == 'development' else None
         }), 500
 
+@app.route('/translate/segment', methods=['POST'])
+def translate_segment():
+    """Translate a single finished paragraph ahead of time (live translation) and cache it"""
+    try:
+        if translator is None:
+            logger.error("Tradutor não inicializado - Azure não configurado")
+            return jsonify({
+                'error': 'Serviço de tradução não disponível. Verifique a configuração do Azure.',
+                'error_code': 'SERVICE_UNAVAILABLE'
+            }), 503
+        
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('text'), str):
+            return jsonify({'error': 'Campo "text" não fornecido', 'error_code': 'NO_TEXT'}), 400
+        
+        text = data['text'].strip()
+        if not text:
+            return jsonify({'error': 'Texto vazio não pode ser traduzido', 'error_code': 'EMPTY_TEXT'}), 400
+        
+        if len(text) > Config.SEGMENT_MAX_LENGTH:
+            return jsonify({
+                'error': f'Segmento muito longo. Máximo permitido: {Config.SEGMENT_MAX_LENGTH} caracteres',
+                'error_code': 'SEGMENT_TOO_LONG',
+                'max_length': Config.SEGMENT_MAX_LENGTH,
+                'received_length': len(text)
+            }), 400
+        
+        source_lang = data.get('source_language', Config.DEFAULT_SOURCE_LANGUAGE)
+        target_lang = data.get('target_language', Config.DEFAULT_TARGET_LANGUAGE)
+        preserve_formatting = data.get('preserve_formatting', True)
+        
+        language_error = _validate_languages(source_lang, target_lang)
+        if language_error:
+            return language_error
+        
+        # Segmentos em cache não consomem o limite nem chamam o Azure
+        cached = segment_cache.get(text, source_lang, target_lang, preserve_formatting)
+        if cached is not None:
+            return jsonify({'translated_text': cached, 'cached': True})
+        
+        segment_rate_limiter.acquire(request.remote_addr or 'unknown')
+        
+        with tracer.trace(_get_request_id(), 'POST /translate/segment', chars=len(text)):
+            with admission.admit(len(text)):
+                result = translator.translate_article(
+                    text=text,
+                    source_language=source_lang,
+                    target_language=target_lang,
+                    preserve_formatting=preserve_formatting,
+                    request_id=_get_request_id()
+                )
+        
+        segment_cache.set(text, source_lang, target_lang, preserve_formatting, result['translated_text'])
+        return jsonify({
+            'translated_text': result['translated_text'],
+            'cached': False,
+            'translation_time': result.get('translation_time', 0)
+        })
+        
+    except RateLimited as e:
+        logger.warning(f"Segmento recusado pelo rate limit: {e}")
+        return jsonify({
+            'error': 'Muitas traduções de segmentos. Tente novamente em instantes.',
+            'error_code': 'TOO_MANY_REQUESTS',
+            'retry_after': e.retry_after
+        }), 429, {'Retry-After': str(e.retry_after)}
+        
+    except AdmissionRejected as e:
+        logger.warning(f"Segmento recusado pela admissão: {e}")
+        return _admission_rejected_response(e)
+        
+    except Exception as e:
+        logger.error(f"Erro inesperado na tradução de segmento: {e}", exc_info=True)
+        return jsonify({
+            'error': 'Erro interno ao processar tradução. Tente novamente.',
+            'error_code': 'INTERNAL_ERROR',
+            'message': str(e) if app.config.get('FLASK_ENV') == 'development' else None
+        }), 500
+
+@app.route('/translate/batch', methods=['POST'])
+def translate_batch():
+    """Translate many short strings (JSON list/map catalogs or PO catalogs) in one request"""
+    try:
+        if translator is None:
+            logger.error("Tradutor não inicializado - Azure não configurado")
+            return jsonify({
+                'error': 'Serviço de tradução não disponível. Verifique a configuração do Azure.',
+                'error_code': 'SERVICE_UNAVAILABLE'
+            }), 503
+        
+        # Catálogo PO enviado diretamente no corpo, com idiomas na query string
+        raw_po = request.mimetype in Config.PO_MIMETYPES
+        if raw_po:
+            options = request.args
+            catalog_format = 'po'
+            po_text = request.get_data(as_text=True)
+        else:
+            data = request.get_json(silent=True)
+            if not data or not isinstance(data, (list, dict)):
+                logger.warning("Requisição sem dados JSON")
+                return jsonify({'error': 'Dados não fornecidos', 'error_code': 'NO_DATA'}), 400
+            if isinstance(data, list) or ('texts' not in data and 'catalog' not in data):
+                # Catálogo enviado diretamente (lista ou mapa), com idiomas na query string
+                options = dict(request.args, texts=data)
+            else:
+                options = data
+            catalog_format = options.get('format', 'json')
+            po_text = options.get('catalog', '')
+            if catalog_format == 'po' and not isinstance(po_text, str):
+                logger.warning("Campo 'catalog' não é uma string")
+                return jsonify({
+                    'error': 'Campo "catalog" deve ser o conteúdo do arquivo PO como string',
+                    'error_code': 'INVALID_CATALOG'
+                }), 400
+        
+        source_lang = options.get('source_language', Config.DEFAULT_SOURCE_LANGUAGE)
+        target_lang = options.get('target_language', Config.DEFAULT_TARGET_LANGUAGE)
+        language_error = _validate_languages(source_lang, target_lang)
+        if language_error:
+            return language_error
+        
+        if catalog_format == 'po':
+            entries = parse_po(po_text)
+            pending = po_untranslated(entries)
+            strings = [text for entry in pending for text in po_source_strings(entry)]
+        elif catalog_format == 'json':
+            texts = options.get('texts')
+            if not isinstance(texts, (list, dict)):
+                logger.warning("Requisição sem campo 'texts' válido")
+                return jsonify({
+                    'error': 'Campo "texts" deve ser uma lista ou um mapa de strings',
+                    'error_code': 'NO_TEXTS'
+                }), 400
+            strings = collect_strings(texts)
+        else:
+            logger.warning(f"Formato de catálogo não suportado: {catalog_format}")
+            return jsonify({
+                'error': f'Formato de catálogo não suportado: {catalog_format}',
+                'error_code': 'UNSUPPORTED_FORMAT',
+                'supported_formats': ['json', 'po']
+            }), 400
+        
+        if len(strings) > Config.BATCH_MAX_STRINGS:
+            logger.warning(f"Lote muito grande: {len(strings)} textos (máximo: {Config.BATCH_MAX_STRINGS})")
+            return jsonify({
+                'error': f'Lote muito grande. Máximo permitido: {Config.BATCH_MAX_STRINGS} textos',
+                'error_code': 'TOO_MANY_STRINGS',
+                'max_strings': Config.BATCH_MAX_STRINGS,
+                'received_strings': len(strings)
+            }), 400
+        
+        longest = max((len(text) for text in strings), default=0)
+        if longest > Config.BATCH_MAX_STRING_LENGTH:
+            logger.warning(f"Texto muito longo no lote: {longest} caracteres")
+            return jsonify({
+                'error': f'Texto muito longo no lote. Máximo por texto: {Config.BATCH_MAX_STRING_LENGTH} caracteres',
+                'error_code': 'TEXT_TOO_LONG',
+                'max_length': Config.BATCH_MAX_STRING_LENGTH
+            }), 400
+        
+        logger.info(f"Tradução em lote solicitada: {source_lang} -> {target_lang}, "
+                    f"{len(strings)} textos, formato {catalog_format}")
+        
+        with tracer.trace(_get_request_id(), 'POST /translate/batch', strings=len(strings)):
+            with admission.admit(sum(len(text) for text in set(strings))):
+                result = translator.translate_batch(strings, source_lang, target_lang)
+        
+        response = {
+            'count': len(strings),
+            'unique_count': result['unique_count'],
+            'requests': result['requests'],
+            'translation_time': result['translation_time']
+        }
+        if catalog_format == 'po':
+            translations = iter(result['translations'])
+            for entry in pending:
+                po_apply_translations(entry, [next(translations) for _ in po_source_strings(entry)])
+            catalog = render_po(entries)
+            if raw_po:
+                return Response(catalog, mimetype='text/x-gettext-translation')
+            response['catalog'] = catalog
+        else:
+            response['translations'] = replace_strings(texts, iter(result['translations']))
+        
+        return jsonify(response)
+        
+    except AdmissionRejected as e:
+        logger.warning(f"Requisição recusada pela admissão: {e}")
+        return _admission_rejected_response(e)
+        
+    except Exception as e:
+        logger.error(f"Erro inesperado na tradução em lote: {e}", exc_info=True)
+        return jsonify({
+            'error': 'Erro interno ao processar tradução. Tente novamente.',
+            'error_code': 'INTERNAL_ERROR',
+            'message': str(e) if app.config.get('FLASK_ENV') == 'development' else None
+        }), 500
+
+@app.route('/translate/file', methods=['POST'])
+def translate_file():
+    """Translate an uploaded article file, streaming the result back as a download"""
+    if translator is None:
+        logger.error("Tradutor não inicializado - Azure não configurado")
+        return jsonify({
+            'error': 'Serviço de tradução não disponível. Verifique a configuração do Azure.',
+            'error_code': 'SERVICE_UNAVAILABLE'
+        }), 503
+    
+    if request.content_length and request.content_length > Config.MAX_UPLOAD_SIZE:
+        logger.warning(f"Arquivo muito grande: {request.content_length} bytes (máximo: {Config.MAX_UPLOAD_SIZE})")
+        return jsonify({
+            'error': f'Arquivo muito grande. Máximo permitido: {Config.MAX_UPLOAD_SIZE} bytes',
+            'error_code': 'FILE_TOO_LARGE',
+            'max_size': Config.MAX_UPLOAD_SIZE,
+            'received_size': request.content_length
+        }), 413
+    if request.content_length is None and 'decompressing_stream' not in g:
+        # Upload chunked, sem Content-Length: o limite é aplicado durante a leitura
+        # (+1 porque o LimitedStream recusa até um corpo que termina exatamente no limite)
+        request.environ['wsgi.input'] = LimitedStream(
+            request.environ['wsgi.input'], Config.MAX_UPLOAD_SIZE + 1, is_max=True
+        )
+    
+    # Multipart (campo "file") ou corpo bruto com ?filename=artigo.md
+    if request.mimetype == 'multipart/form-data':
+        # O parser do multipart lê (e descomprime) o corpo aqui; em modo silencioso ele
+        # descarta o erro, que fica guardado no stream
+        try:
+            upload = request.files.get('file')
+            decompression_error = getattr(g.get('decompressing_stream'), 'error', None)
+            if decompression_error is not None:
+                raise decompression_error
+        except DecompressionError as e:
+            logger.warning(f"Erro ao descomprimir arquivo: {e}")
+            return jsonify({'error': str(e), 'error_code': 'INVALID_CONTENT_ENCODING'}), 400
+        except RequestEntityTooLarge:
+            return _upload_too_large_response()
+        if upload is None:
+            logger.warning("Requisição multipart sem campo 'file'")
+            return jsonify({'error': 'Campo "file" não fornecido', 'error_code': 'NO_FILE'}), 400
+        filename = upload.filename or ''
+        stream = upload.stream
+        options = request.form
+    else:
+        filename = request.args.get('filename', '')
+        stream = request.stream
+        options = request.args
+    
+    filename = secure_filename(filename) or 'artigo.txt'
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in Config.UPLOAD_TYPES:
+        logger.warning(f"Formato de arquivo não suportado: {extension}")
+        return jsonify({
+            'error': f'Formato de arquivo não suportado: {extension}',
+            'error_code': 'UNSUPPORTED_FILE_TYPE',
+            'supported_types': list(Config.UPLOAD_TYPES.keys())
+        }), 400
+    
+    source_lang = options.get('source_language', Config.DEFAULT_SOURCE_LANGUAGE)
+    target_lang = options.get('target_language', Config.DEFAULT_TARGET_LANGUAGE)
+    preserve_formatting = options.get('preserve_formatting', 'true').lower() != 'false'
+    language_error = _validate_languages(source_lang, target_lang)
+    if language_error:
+        return language_error
+    
+    try:
+        first_chunk = stream.read(Config.UPLOAD_READ_SIZE)
+    except DecompressionError as e:
+        logger.warning(f"Erro ao descomprimir arquivo: {e}")
+        return jsonify({'error': str(e), 'error_code': 'INVALID_CONTENT_ENCODING'}), 400
+    except RequestEntityTooLarge:
+        return _upload_too_large_response()
+    if not first_chunk.strip():
+        logger.warning("Tentativa de traduzir arquivo vazio")
+        return jsonify({'error': 'Arquivo vazio não pode ser traduzido', 'error_code': 'EMPTY_TEXT'}), 400
+    
+    # Tamanho desconhecido (chunked) cai na faixa de documentos grandes
+    lane = admission.lane_for(request.content_length or Config.MAX_UPLOAD_SIZE)
+    try:
+        started_at = lane.acquire()
+    except AdmissionRejected as e:
+        logger.warning(f"Requisição recusada pela admissão: {e}")
+        return _admission_rejected_response(e)
+    
+    mimetype = Config.UPLOAD_TYPES[extension]
+    text_type = 'html' if mimetype == 'text/html' else 'plain'
+    logger.info(f"Tradução de arquivo solicitada: {filename}, {source_lang} -> {target_lang}")
+    
+    request_id = _get_request_id()
+    
+    def generate():
+        try:
+            with tracer.trace(request_id, 'POST /translate/file', filename=filename):
+                yield from translator.translate_stream(
+                    _iter_stream_lines(stream, first_chunk),
+                    source_language=source_lang,
+                    target_language=target_lang,
+                    preserve_formatting=preserve_formatting and text_type == 'plain',
+                    text_type=text_type
+                )
+            logger.info(f"Tradução de arquivo concluída: {filename}")
+        except DecompressionError as e:
+            logger.warning(f"Erro ao descomprimir arquivo durante a tradução: {e}")
+            yield _stream_error_marker('INVALID_CONTENT_ENCODING', request_id)
+        except RequestEntityTooLarge:
+            logger.warning(f"Arquivo excedeu {Config.MAX_UPLOAD_SIZE} bytes durante a tradução")
+            yield _stream_error_marker('FILE_TOO_LARGE', request_id)
+        except Exception as e:
+            # O status 200 já foi enviado: o marcador no fim do corpo indica o download incompleto
+            logger.error(f"Erro inesperado na tradução de arquivo: {e}", exc_info=True)
+            yield _stream_error_marker('INTERNAL_ERROR', request_id)
+    
+    download_name = f"traducao_{target_lang}_{filename}"
+    response = Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{download_name}"',
+            'X-Error-Marker': FILE_STREAM_ERROR_MARKER
+        }
+    )
+    # A vaga só é liberada quando o download termina
+    response.call_on_close(lambda: lane.release(started_at))
+    return response
+
 @app.route('/languages')
 def get_supported_languages():
     """Get list of supported languages"""
-    return jsonify(translator.get_supported_languages())
+    return _cacheable(jsonify(translator.get_supported_languages()))
 
 @app.route('/technical-terms')
 def get_technical_terms():
     """Get technical terms dictionary"""
-    return jsonify(translator.get_technical_terms())
+    return _cacheable(jsonify(translator.get_technical_terms()))
+
+@app.route('/admin/profiles')
+@require_admin
+def list_profiles():
+    """List stored request profiles"""
+    return jsonify(profile_store.list_profiles())
+
+@app.route('/admin/profiles/<profile_id>')
+@require_admin
+def download_profile(profile_id):
+    """Download a request profile as collapsed stacks or as an SVG flame graph"""
+    collapsed = profile_store.load(profile_id)
+    if collapsed is None:
+        return jsonify({'error': 'Perfil não encontrado', 'error_code': 'PROFILE_NOT_FOUND'}), 404
+    
+    if request.args.get('format') == 'svg':
+        svg = render_flame_graph(collapsed, title=f'translate_article - {profile_id}')
+        return Response(svg, mimetype='image/svg+xml')
+    
+    return Response(
+        collapsed,
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'attachment; filename="{profile_id}.collapsed"'}
+    )
+
+@app.route('/admin/traces/slow')
+@require_admin
+def list_slow_traces():
+    """List the slow requests kept in the trace ring buffer"""
+    return jsonify({
+        'threshold_seconds': tracer.slow_threshold,
+        'traces': tracer.get_slow_traces()
+    })
+
+@app.route('/admin/traces/slow/<request_id>')
+@require_admin
+def get_slow_trace(request_id):
+    """Full span tree of a slow request"""
+    trace = tracer.get_slow_trace(request_id)
+    if trace is None:
+        return jsonify({'error': 'Trace não encontrado', 'error_code': 'TRACE_NOT_FOUND'}), 404
+    return jsonify(trace)
 
 @app.route('/health')
 def health_check():
@@ -162,7 +730,9 @@ def health_check():
         'timestamp': datetime.now().isoformat(),
         'azure_configured': azure_configured,
         'translator_ready': translator_ready,
-        'supported_languages_count': len(translator.get_supported_languages()) if translator else 0
+        'supported_languages_count': len(translator.get_supported_languages()) if translator else 0,
+        'admission': admission.stats(),
+        'segment_cache': segment_cache.stats()
     })
 
 if __name__ == '__main__':
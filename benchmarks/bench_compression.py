@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Mede bytes trafegados e custo de CPU da compressão dos payloads da API
+
+Compara gzip (e br/zstd, se instalados) em vários níveis para corpos típicos
+de /translate, para o glossário de /technical-terms e para respostas pequenas,
+onde a compressão pode custar mais do que economiza.
+
+Uso: python benchmarks/bench_compression.py
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_article
+from compression import available_encodings, compress, brotli, zstandard
+
+LEVELS = [1, 6, 9]
+
+
+def build_payloads():
+    payloads = {
+        'health (pequeno)': json.dumps({'status': 'healthy', 'azure_configured': True}).encode('utf-8'),
+    }
+    for kind in ('prose', 'code'):
+        for size in (1_000, 10_000, 50_000):
+            article = generate_article(kind, size)
+            body = {'text': article, 'source_language': 'en', 'target_language': 'pt'}
+            payloads[f'translate {kind} {size // 1000}KB'] = json.dumps(body).encode('utf-8')
+    terms_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'data', 'technical_terms.json')
+    with open(terms_file, 'rb') as f:
+        payloads['technical-terms'] = json.dumps(json.load(f)).encode('utf-8')
+    return payloads
+
+
+def decompress(data, encoding):
+    if encoding == 'br':
+        return brotli.decompress(data)
+    if encoding == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def best_time(func, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"Codificações disponíveis: {', '.join(available_encodings())}\n")
+    print(f"{'payload':<24} {'codif.':<6} {'nível':>5} {'bytes':>9} {'comprimido':>11} "
+          f"{'razão':>7} {'comp. (ms)':>11} {'descomp. (ms)':>14}")
+
+    for name, data in build_payloads().items():
+        for encoding in available_encodings():
+            for level in LEVELS:
+                compressed = compress(data, encoding, level=level)
+                compress_time = best_time(lambda: compress(data, encoding, level=level))
+                decompress_time = best_time(lambda: decompress(compressed, encoding))
+                print(f"{name:<24} {encoding:<6} {level:>5} {len(data):>9,} {len(compressed):>11,} "
+                      f"{len(compressed) / len(data):>7.2f} {compress_time * 1000:>11.3f} "
+                      f"{decompress_time * 1000:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Mede o pico de memória por MB enviado no endpoint /translate/file
+
+Usa um cliente que devolve o próprio texto no lugar do Azure Translator,
+então mede apenas o custo de leitura, segmentação e resposta em streaming.
+
+Uso: python benchmarks/bench_file_upload.py [tamanhos em MB...]
+"""
+
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from translator_service import TechnicalTranslator
+
+PARAGRAPH = (
+    "Machine learning pipelines usually run on Kubernetes clusters, and the "
+    "`kubectl` command is used to inspect pods and deployments.\n\n"
+)
+CODE_BLOCK = "```python\nfor item in items:\n    process(item)\n```\n\n"
+
+
+class EchoClient:
+    """Cliente falso que devolve o texto recebido como tradução"""
+
+    def translate(self, content, to, from_parameter=None, text_type=None):
+        return [
+            SimpleNamespace(translations=[SimpleNamespace(text=item.text)])
+            for item in content
+        ]
+
+
+def build_translator():
+    return TechnicalTranslator(client=EchoClient())
+
+
+def build_document(size_mb):
+    unit = PARAGRAPH * 9 + CODE_BLOCK
+    target = int(size_mb * 1024 * 1024)
+    return (unit * (target // len(unit) + 1))[:target].encode('utf-8')
+
+
+def measure(client, body):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.post(
+        '/translate/file?filename=artigo.md&source_language=en&target_language=pt',
+        data=body,
+        content_type='text/markdown',
+        buffered=False
+    )
+    received = sum(len(chunk) for chunk in response.response)
+    # Fechar a resposta libera a vaga da faixa de admissão (call_on_close)
+    response.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert response.status_code == 200, response.status_code
+    return received, peak, elapsed
+
+
+def main():
+    # Importado aqui para que outros benchmarks possam reusar o EchoClient sem subir a app
+    import app as app_module
+
+    sizes = [float(arg) for arg in sys.argv[1:]] or [0.5, 1, 2, 4]
+    logging.disable(logging.INFO)
+    app_module.translator = build_translator()
+    app_module.app.config['TESTING'] = True
+    client = app_module.app.test_client()
+
+    print(f"{'MB enviados':>12} {'bytes resposta':>15} {'pico (KB)':>10} {'KB/MB':>8} {'tempo (s)':>10}")
+    for size_mb in sizes:
+        body = build_document(size_mb)
+        received, peak, elapsed = measure(client, body)
+        print(f"{size_mb:>12.1f} {received:>15,} {peak / 1024:>10.0f} "
+              f"{peak / 1024 / size_mb:>8.0f} {elapsed:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
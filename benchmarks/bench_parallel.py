@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Mede o ganho do pré/pós-processamento em pool de processos (sem acesso ao Azure)
+
+Traduz artigos sintéticos de vários MB com um cliente que devolve o próprio
+texto, primeiro no pipeline sequencial e depois com o pool em diferentes
+números de processos, e mostra o tempo e o speedup de cada configuração.
+A partida dos processos do pool não entra na medição.
+
+Uso:
+    python benchmarks/bench_parallel.py                     # 1, 2, 4... até o número de CPUs
+    python benchmarks/bench_parallel.py --workers 2 4 8 --sizes 2 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_file_upload import EchoClient
+from config import Config
+from corpus import KINDS, generate_article
+from parallel import PreprocessingPool
+from translator_service import TechnicalTranslator
+
+
+def default_workers():
+    cpus = os.cpu_count() or 1
+    counts = [2]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def measure(translator, article, rounds):
+    """Melhor tempo e o texto traduzido"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        output = translator._translate_text(article, 'en', 'pt')
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=float, nargs='+', default=[2, 5], help='tamanhos em MB')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers(), help='números de processos')
+    parser.add_argument('--kinds', nargs='+', default=list(KINDS), choices=KINDS, help='perfis de corpus')
+    parser.add_argument('--rounds', type=int, default=1, help='repetições (vale o melhor tempo)')
+    parser.add_argument('--budget', type=float, default=60.0,
+                        help='segundos do pipeline sequencial a partir dos quais o perfil não roda em tamanhos maiores')
+    args = parser.parse_args()
+
+    # Todo documento medido passa pelo pool
+    Config.PARALLEL_PREPROCESS_THRESHOLD = 0
+    sequential = TechnicalTranslator(client=EchoClient(), preprocessing_pool=PreprocessingPool(max_workers=0))
+    pools = {}
+    for workers in args.workers:
+        translator = TechnicalTranslator(client=EchoClient(), preprocessing_pool=PreprocessingPool(max_workers=workers))
+        translator._translate_text(generate_article('prose', 10_000), 'en', 'pt')
+        pools[workers] = translator
+
+    print(f"CPUs: {os.cpu_count()}, trechos de {Config.PARALLEL_PIECE_SIZE // 1024}KB")
+    header = f"{'perfil':<9} {'tamanho':>8} {'sequencial':>11}"
+    print(header + ''.join(f"{f'{workers} proc.':>18}" for workers in args.workers))
+
+    try:
+        for kind in args.kinds:
+            for size_mb in args.sizes:
+                article = generate_article(kind, int(size_mb * 1024 * 1024))
+                baseline, expected = measure(sequential, article, args.rounds)
+                cells = ''
+                for workers, translator in pools.items():
+                    seconds, output = measure(translator, article, args.rounds)
+                    # Speedup só vale se o resultado for idêntico ao do pipeline sequencial
+                    if output != expected:
+                        print(f"{kind} {size_mb}MB com {workers} processos: resultado difere do sequencial "
+                              f"({len(output)} x {len(expected)} caracteres)")
+                        return 1
+                    cells += f"{seconds:>9.2f}s ({baseline / seconds:>4.1f}x)"
+                print(f"{kind:<9} {size_mb:>6.1f}MB {baseline:>10.2f}s{cells}", flush=True)
+                if baseline > args.budget:
+                    break
+    finally:
+        for translator in pools.values():
+            translator.preprocessing_pool.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
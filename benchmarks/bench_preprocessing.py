@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks do pipeline de pré/pós-processamento (sem acesso ao Azure)
+
+Mede, por estágio, tempo e pico de memória alocada para artigos sintéticos
+de vários tamanhos e perfis, estima a curva de escalonamento (expoente do
+ajuste log-log: ~1 linear, ~2 quadrático) e compara com um baseline salvo.
+
+Uso:
+    python benchmarks/bench_preprocessing.py                  # mede e compara com o baseline
+    python benchmarks/bench_preprocessing.py --save-baseline  # grava benchmarks/baseline.json
+    python benchmarks/bench_preprocessing.py --quick          # apenas até 100KB
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import KINDS, generate_article
+from translator_service import TechnicalTranslator
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+QUICK_SIZES = [1_000, 10_000, 100_000]
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+MIN_BASELINE_SECONDS = 0.001
+
+
+def build_stages(translator, article):
+    """Retorna os estágios na ordem do pipeline, com as entradas já preparadas"""
+    formatting_data = translator._preserve_formatting(article)
+    text = formatting_data['text']
+    return {
+        'preserve_formatting': lambda: translator._preserve_formatting(article),
+        'split_text_into_chunks': lambda: translator._split_text_into_chunks(text),
+        'preserve_technical_terms': lambda: translator._preserve_technical_terms(text, 'en', 'pt'),
+        'restore_formatting': lambda: translator._restore_formatting(text, formatting_data),
+    }
+
+
+def time_call(func, min_total=0.2, rounds=5):
+    """Melhor tempo por chamada, repetindo chamadas rápidas até somar `min_total` segundos"""
+    start = time.perf_counter()
+    func()
+    single = time.perf_counter() - start
+    loops = max(1, int(min_total / max(single, 1e-6)))
+    if single > min_total:
+        return single
+
+    best = single
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def peak_memory(func):
+    """Pico de memória alocada (bytes) durante uma chamada"""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def scaling_exponent(points):
+    """Expoente do ajuste log-log tempo x tamanho"""
+    points = [(size, seconds) for size, seconds in points if seconds]
+    if len(points) < 2:
+        return None
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+
+
+def run(sizes, budget, measure_memory=True):
+    """Executa todos os estágios; estágios que estouram o orçamento não rodam nos tamanhos maiores"""
+    translator = TechnicalTranslator(client=object())
+    results = {}
+
+    for kind in KINDS:
+        skipped = set()
+        for size in sizes:
+            article = generate_article(kind, size)
+            for stage, func in build_stages(translator, article).items():
+                key = f"{kind}/{stage}/{size}"
+                if stage in skipped:
+                    results[key] = None
+                    continue
+
+                seconds = time_call(func)
+                peak = peak_memory(func) if measure_memory and seconds < budget / 4 else None
+                results[key] = {'seconds': seconds, 'peak_bytes': peak}
+                if seconds > budget:
+                    skipped.add(stage)
+
+                memory = f"{peak / 1024:>10.0f}" if peak is not None else f"{'-':>10}"
+                print(f"{kind:<9} {stage:<25} {size:>9,} {seconds * 1000:>12.3f} {memory}", flush=True)
+
+    return results
+
+
+def print_scaling(results, sizes):
+    print("\nCurvas de escalonamento (ms por tamanho; expoente ~1 linear, ~2 quadrático)")
+    stages = sorted({key.rsplit('/', 1)[0] for key in results})
+    print(f"{'perfil/estágio':<36}" + ''.join(f"{size:>12,}" for size in sizes) + f"{'expoente':>10}")
+    for stage in stages:
+        row = [results.get(f"{stage}/{size}") for size in sizes]
+        cells = ''.join(f"{entry['seconds'] * 1000:>12.2f}" if entry else f"{'-':>12}" for entry in row)
+        exponent = scaling_exponent([
+            (size, entry['seconds']) for size, entry in zip(sizes, row)
+            if entry and entry['seconds'] > 0
+        ])
+        print(f"{stage:<36}{cells}{exponent:>10.2f}" if exponent is not None else f"{stage:<36}{cells}{'-':>10}")
+
+
+def check_baseline(results, baseline, threshold):
+    """Lista os estágios mais lentos que o baseline além do limite"""
+    regressions = []
+    for key, entry in results.items():
+        reference = baseline.get(key)
+        if not entry or not reference or reference['seconds'] < MIN_BASELINE_SECONDS:
+            continue
+        ratio = entry['seconds'] / reference['seconds']
+        if ratio > threshold:
+            regressions.append((key, reference['seconds'], entry['seconds'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='mede apenas até 100KB')
+    parser.add_argument('--no-memory', action='store_true', help='não mede memória (mais rápido)')
+    parser.add_argument('--budget', type=float, default=5.0,
+                        help='segundos por chamada a partir dos quais o estágio não roda em tamanhos maiores')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='razão atual/baseline considerada regressão (padrão: 1.25)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='arquivo de baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='grava o resultado como baseline')
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    print(f"{'perfil':<9} {'estágio':<25} {'tamanho':>9} {'tempo (ms)':>12} {'pico (KB)':>10}")
+    results = run(sizes, args.budget, measure_memory=not args.no_memory)
+    print_scaling(results, sizes)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline salvo em {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNenhum baseline encontrado; use --save-baseline para criar um.")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = check_baseline(results, baseline, args.threshold)
+    if not regressions:
+        print(f"\nSem regressões acima de {args.threshold:.2f}x em relação ao baseline.")
+        return 0
+
+    print(f"\nRegressões acima de {args.threshold:.2f}x:")
+    for key, before, after, ratio in regressions:
+        print(f"  {key}: {before * 1000:.3f}ms -> {after * 1000:.3f}ms ({ratio:.2f}x)")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
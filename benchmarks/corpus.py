@@ -0,0 +1,80 @@
+"""
+Gerador de corpus sintético para os benchmarks
+
+Produz artigos determinísticos (mesma semente, mesmo texto) em três perfis:
+- code: muitos blocos de código e código inline
+- prose: parágrafos longos, quase sem código
+- glossary: texto denso em termos do dicionário técnico
+"""
+
+import json
+import os
+import random
+
+KINDS = ('code', 'prose', 'glossary')
+
+WORDS = (
+    "the system uses a simple approach to handle requests and the results are "
+    "stored for later analysis while each component keeps its own state and "
+    "reports metrics to a central service that aggregates them over time"
+).split()
+
+CODE_SNIPPETS = [
+    "def handler(event):\n    return process(event['body'])",
+    "for item in items:\n    total += item.price * item.quantity",
+    "const result = await fetch(url, { method: 'POST' });\nconsole.log(result.status);",
+    "SELECT id, name FROM users WHERE active = 1 ORDER BY name;",
+]
+
+INLINE_SNIPPETS = ['`kubectl get pods`', '`npm install`', '`git rebase`', '`SELECT *`', '`x += 1`']
+
+TERMS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'data', 'technical_terms.json')
+
+
+def _load_terms():
+    with open(TERMS_FILE, 'r', encoding='utf-8') as f:
+        return sorted(json.load(f).get('en', {}))
+
+
+def _sentence(rng, terms=None, term_ratio=0.0, inline_ratio=0.0):
+    words = []
+    for _ in range(rng.randint(8, 20)):
+        roll = rng.random()
+        if terms and roll < term_ratio:
+            words.append(rng.choice(terms))
+        elif roll < term_ratio + inline_ratio:
+            words.append(rng.choice(INLINE_SNIPPETS))
+        else:
+            words.append(rng.choice(WORDS))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng, **kwargs):
+    return ' '.join(_sentence(rng, **kwargs) for _ in range(rng.randint(2, 6)))
+
+
+def generate_article(kind: str, size: int, seed: int = 42) -> str:
+    """Gera um artigo sintético do perfil `kind` com aproximadamente `size` caracteres"""
+    if kind not in KINDS:
+        raise ValueError(f"Perfil de corpus desconhecido: {kind}")
+
+    rng = random.Random(f"{kind}-{seed}")
+    terms = _load_terms() if kind == 'glossary' else None
+    parts = ["# Synthetic article\n\n"]
+    length = len(parts[0])
+
+    while length < size:
+        if kind == 'code':
+            if rng.random() < 0.4:
+                block = f"```python\n{rng.choice(CODE_SNIPPETS)}\n```\n\n"
+            else:
+                block = _paragraph(rng, inline_ratio=0.15) + "\n\n"
+        elif kind == 'prose':
+            block = _paragraph(rng, inline_ratio=0.005) + "\n\n"
+        else:
+            block = _paragraph(rng, terms=terms, term_ratio=0.35) + "\n\n"
+        parts.append(block)
+        length += len(block)
+
+    return ''.join(parts)[:size]
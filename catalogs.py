@@ -0,0 +1,122 @@
+import re
+from typing import Any, Dict, Iterator, List
+
+# Palavras-chave de uma entrada PO (gettext)
+PO_KEYWORD_PATTERN = re.compile(r'^(msgctxt|msgid_plural|msgid|msgstr(?:\[\d+\])?)\s+"(.*)"\s*$')
+PO_CONTINUATION_PATTERN = re.compile(r'^"(.*)"\s*$')
+PO_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+
+
+def collect_strings(catalog: Any) -> List[str]:
+    """Coleta, em ordem, todas as strings de um catálogo JSON (lista, mapa ou aninhado)"""
+    if isinstance(catalog, str):
+        return [catalog]
+    if isinstance(catalog, dict):
+        return [text for value in catalog.values() for text in collect_strings(value)]
+    if isinstance(catalog, list):
+        return [text for value in catalog for text in collect_strings(value)]
+    return []
+
+
+def replace_strings(catalog: Any, translations: Iterator[str]) -> Any:
+    """Reconstrói o catálogo JSON substituindo as strings na mesma ordem de collect_strings"""
+    if isinstance(catalog, str):
+        return next(translations)
+    if isinstance(catalog, dict):
+        return {key: replace_strings(value, translations) for key, value in catalog.items()}
+    if isinstance(catalog, list):
+        return [replace_strings(value, translations) for value in catalog]
+    return catalog
+
+
+def _unescape_po(value: str) -> str:
+    return re.sub(r'\\(.)', lambda match: PO_ESCAPES.get(match.group(1), match.group(0)), value)
+
+
+def _escape_po(value: str) -> str:
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n').replace('\t', '\\t').replace('\r', '\\r'))
+
+
+def parse_po(text: str) -> List[Dict]:
+    """Lê um catálogo PO, preservando os comentários de cada entrada"""
+    entries = []
+    entry = None
+    field = None
+    comments = []
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        keyword = PO_KEYWORD_PATTERN.match(stripped)
+        continuation = PO_CONTINUATION_PATTERN.match(stripped)
+
+        if keyword:
+            name, value = keyword.groups()
+            # msgctxt/msgid após um msgstr inicia uma nova entrada
+            starts_entry = entry is None or any(key.startswith('msgstr') for key in entry['fields'])
+            if name in ('msgctxt', 'msgid') and (starts_entry or name in entry['fields']):
+                entry = {'comments': comments, 'fields': {}}
+                entries.append(entry)
+                comments = []
+            elif entry is None:
+                continue
+            field = name
+            entry['fields'][field] = _unescape_po(value)
+        elif continuation and field is not None:
+            entry['fields'][field] += _unescape_po(continuation.group(1))
+        else:
+            # Comentários (inclusive entradas obsoletas "#~") pertencem à próxima entrada
+            field = None
+            if stripped:
+                comments.append(line)
+
+    if comments:
+        entries.append({'comments': comments, 'fields': {}})
+    return entries
+
+
+def render_po(entries: List[Dict]) -> str:
+    """Gera o texto PO a partir das entradas de parse_po"""
+    blocks = []
+    for entry in entries:
+        lines = list(entry['comments'])
+        for name, value in entry['fields'].items():
+            if '\n' in value[:-1]:
+                lines.append(f'{name} ""')
+                lines.extend(f'"{_escape_po(part)}"' for part in value.splitlines(keepends=True))
+            else:
+                lines.append(f'{name} "{_escape_po(value)}"')
+        blocks.append('\n'.join(lines))
+    return '\n\n'.join(blocks) + '\n'
+
+
+def po_untranslated(entries: List[Dict]) -> List[Dict]:
+    """Retorna as entradas PO ainda sem tradução (ignora o cabeçalho)"""
+    pending = []
+    for entry in entries:
+        fields = entry['fields']
+        if not fields.get('msgid'):
+            continue
+        msgstrs = [value for name, value in fields.items() if name.startswith('msgstr')]
+        if not any(msgstrs):
+            pending.append(entry)
+    return pending
+
+
+def po_source_strings(entry: Dict) -> List[str]:
+    """Textos a traduzir de uma entrada PO: msgid e, se houver, msgid_plural"""
+    fields = entry['fields']
+    if 'msgid_plural' in fields:
+        return [fields['msgid'], fields['msgid_plural']]
+    return [fields['msgid']]
+
+
+def po_apply_translations(entry: Dict, translations: List[str]):
+    """Preenche msgstr (ou msgstr[n] para plurais) com as traduções"""
+    fields = entry['fields']
+    if 'msgid_plural' in fields:
+        singular, plural = translations
+        for name in [name for name in fields if name.startswith('msgstr[')]:
+            fields[name] = singular if name == 'msgstr[0]' else plural
+    else:
+        fields['msgstr'] = translations[0]
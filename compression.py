@@ -0,0 +1,282 @@
+import io
+import gzip
+import zlib
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'image/svg+xml', 'text/x-gettext-translation'
+}
+
+# Respostas cacheáveis já comprimidas: (codificação, SHA-256 do corpo) -> bytes
+_precompressed: Dict[Tuple[str, str], bytes] = {}
+# Várias threads do gthread consultam e podam o cache ao mesmo tempo
+_precompressed_lock = threading.Lock()
+
+
+class DecompressionError(ValueError):
+    """Corpo comprimido inválido ou maior que o limite permitido"""
+
+
+def available_encodings() -> list:
+    """Codificações suportadas, na ordem de preferência do servidor"""
+    encodings = []
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    encodings.append('gzip')
+    return encodings
+
+
+# Maior bloco do zstd: um bloco RLE de 4 bytes pode gerar até isso de saída
+ZSTD_MAX_BLOCK_SIZE = 128 * 1024
+
+
+class _ZlibDecoder:
+    """gzip/zlib com saída limitada por max_length + unconsumed_tail"""
+
+    def __init__(self):
+        # wbits=47 aceita tanto gzip quanto zlib
+        self._decompressor = zlib.decompressobj(wbits=47)
+        self._pending = b''
+        self._drained = True
+
+    @property
+    def needs_input(self) -> bool:
+        return not self._pending and self._drained
+
+    @property
+    def eof(self) -> bool:
+        return self._decompressor.eof
+
+    def feed(self, data: bytes):
+        self._pending = data
+
+    def read(self, size: int) -> bytes:
+        output = self._decompressor.decompress(self._pending, size)
+        self._pending = self._decompressor.unconsumed_tail
+        # Saída do tamanho máximo: pode haver mais dados retidos no descompressor
+        self._drained = len(output) < size
+        return output
+
+
+class _BrotliDecoder:
+    """Brotli com saída limitada por output_buffer_limit (brotli >= 1.1)"""
+
+    def __init__(self):
+        self._decompressor = brotli.Decompressor()
+        self._pending = b''
+        self._drained = True
+
+    @property
+    def needs_input(self) -> bool:
+        return not self._pending and self._drained
+
+    @property
+    def eof(self) -> bool:
+        return self._decompressor.is_finished()
+
+    def feed(self, data: bytes):
+        self._pending = data
+
+    def read(self, size: int) -> bytes:
+        if self._decompressor.is_finished():
+            self._pending = b''
+            self._drained = True
+            return b''
+        # Com a saída no limite, o descompressor só aceita entrada vazia até esvaziar
+        data = self._pending if self._decompressor.can_accept_more_data() else b''
+        if data:
+            self._pending = b''
+        output = self._decompressor.process(data, output_buffer_limit=size)
+        self._drained = len(output) < size
+        return output
+
+
+class _ZstdDecoder:
+    """zstd com entrada fatiada pelo orçamento restante
+
+    O decompressobj do zstandard não tem max_length; como cada 4 bytes de
+    entrada geram no máximo um bloco, fatias de 4 bytes por bloco que ainda
+    cabe no limite mantêm a saída em max_size + um bloco.
+    """
+
+    def __init__(self, max_size: int):
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+        self._pending = b''
+        self._remaining = max_size
+
+    @property
+    def needs_input(self) -> bool:
+        return not self._pending
+
+    @property
+    def eof(self) -> bool:
+        return self._decompressor.eof
+
+    def feed(self, data: bytes):
+        self._pending = data
+
+    def read(self, size: int) -> bytes:
+        output = b''
+        while self._pending and not self.eof and len(output) < size:
+            step = max(4, 4 * (max(0, self._remaining) // ZSTD_MAX_BLOCK_SIZE))
+            data, self._pending = self._pending[:step], self._pending[step:]
+            decompressed = self._decompressor.decompress(data)
+            self._remaining -= len(decompressed)
+            output += decompressed
+        if self.eof:
+            # Dados depois do fim do frame são ignorados, como no gzip
+            self._pending = b''
+        return output
+
+
+def _new_decoder(encoding: str, max_size: int):
+    """Cria o descompressor incremental (com saída limitada) da codificação, ou None"""
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        return _ZlibDecoder()
+    if encoding == 'br' and brotli is not None:
+        return _BrotliDecoder()
+    if encoding == 'zstd' and zstandard is not None:
+        return _ZstdDecoder(max_size)
+    return None
+
+
+def is_supported_request_encoding(encoding: str) -> bool:
+    return encoding in ('x-gzip', 'deflate') or encoding in available_encodings()
+
+
+class DecompressingStream(io.RawIOBase):
+    """Stream que descomprime o corpo da requisição sob demanda, com limite de tamanho
+
+    Cada passo produz no máximo `read_size` bytes, então uma bomba de
+    descompressão é recusada ao passar de `max_size`, sem ser expandida inteira.
+    """
+
+    def __init__(self, raw, encoding: str, max_size: int, read_size: int = 64 * 1024):
+        self.raw = raw
+        self.decoder = _new_decoder(encoding, max_size)
+        self.max_size = max_size
+        self.read_size = read_size
+        self.total = 0
+        # Erro guardado: o parser de multipart do werkzeug engole ValueError
+        self.error = None
+        self._received = False
+        self._buffer = b''
+        self._position = 0
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        try:
+            return self._readinto(target)
+        except DecompressionError as e:
+            self.error = e
+            raise
+
+    def _readinto(self, target):
+        while self._position >= len(self._buffer) and not self._eof:
+            if self.decoder.needs_input:
+                if self.decoder.eof:
+                    self._eof = True
+                    break
+                chunk = self.raw.read(self.read_size)
+                if not chunk:
+                    # Corpo vazio é aceito; corpo que para no meio do fluxo, não
+                    if self._received:
+                        raise DecompressionError("Corpo comprimido truncado")
+                    self._eof = True
+                    break
+                self._received = True
+                self.decoder.feed(chunk)
+            try:
+                self._buffer = self.decoder.read(self.read_size)
+                self._position = 0
+            except Exception as e:
+                raise DecompressionError(f"Corpo comprimido inválido: {e}")
+            self.total += len(self._buffer)
+            if self.total > self.max_size:
+                raise DecompressionError(f"Corpo descomprimido excede {self.max_size} bytes")
+
+        # Posição em vez de fatiar o buffer: o zstd pode devolver vários blocos de uma vez
+        size = min(len(target), len(self._buffer) - self._position)
+        target[:size] = self._buffer[self._position:self._position + size]
+        self._position += size
+        return size
+
+
+def decompress_body(raw, encoding: str, max_size: int) -> bytes:
+    """Descomprime um corpo inteiro, respeitando o limite de tamanho"""
+    return DecompressingStream(raw, encoding, max_size).read()
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """Escolhe a codificação da resposta a partir do Accept-Encoding do cliente"""
+    return accept_encodings.best_match(available_encodings())
+
+
+def compress(data: bytes, encoding: str, level: int = None) -> bytes:
+    """Comprime os dados na codificação escolhida"""
+    level = level or Config.COMPRESSION_LEVEL
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def should_compress(response) -> bool:
+    """Decide se vale a pena comprimir a resposta"""
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code >= 300 or 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES and not response.mimetype.startswith('text/'):
+        return False
+    # Respostas pequenas: o cabeçalho gzip e o custo de CPU superam a economia
+    return (response.content_length or 0) >= Config.COMPRESSION_MIN_SIZE
+
+
+def compress_response(response, encoding: str):
+    """Comprime a resposta; respostas cacheáveis reaproveitam a versão já comprimida"""
+    body = response.get_data()
+    cacheable = response.cache_control.public
+
+    if cacheable:
+        # Digest e não hash(): uma colisão serviria o corpo de outra resposta
+        key = (encoding, hashlib.sha256(body).hexdigest())
+        with _precompressed_lock:
+            compressed = _precompressed.get(key)
+        if compressed is None:
+            # Comprime fora do lock; duas threads com o mesmo corpo só repetem o trabalho
+            compressed = compress(body, encoding, level=Config.PRECOMPRESSION_LEVEL)
+            with _precompressed_lock:
+                while len(_precompressed) >= Config.PRECOMPRESSED_CACHE_SIZE:
+                    _precompressed.pop(next(iter(_precompressed)))
+                _precompressed[key] = compressed
+    else:
+        compressed = compress(body, encoding)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
@@ -13,12 +13,92 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     
+    # Endpoints administrativos (/admin/*), desabilitados sem token
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+    
     # Translation Settings
     DEFAULT_SOURCE_LANGUAGE = os.getenv('DEFAULT_SOURCE_LANGUAGE', 'en')
     DEFAULT_TARGET_LANGUAGE = os.getenv('DEFAULT_TARGET_LANGUAGE', 'pt')
     
     # Technical terminology preservation
     TECHNICAL_TERMS_FILE = 'data/technical_terms.json'
+    GLOSSARY_PIVOT_LANGUAGE = os.getenv('GLOSSARY_PIVOT_LANGUAGE', 'en')
+    
+    # Tradução em lote (/translate/batch); limites por chamada do Azure Translator
+    BATCH_MAX_ITEMS = 1000
+    BATCH_MAX_CHARS = 50000
+    BATCH_MAX_STRINGS = int(os.getenv('BATCH_MAX_STRINGS', '20000'))
+    BATCH_MAX_STRING_LENGTH = int(os.getenv('BATCH_MAX_STRING_LENGTH', '5000'))
+    PO_MIMETYPES = {'text/x-gettext-translation', 'text/x-po', 'application/x-po'}
+    
+    # Upload de arquivos (/translate/file)
+    MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', str(5 * 1024 * 1024)))
+    UPLOAD_READ_SIZE = 64 * 1024
+    UPLOAD_TYPES = {
+        '.md': 'text/markdown',
+        '.txt': 'text/plain',
+        '.html': 'text/html',
+        '.htm': 'text/html'
+    }
+    
+    # Tradução ao vivo por parágrafo (/translate/segment)
+    SEGMENT_MAX_LENGTH = int(os.getenv('SEGMENT_MAX_LENGTH', '5000'))
+    # Cache e rate limit ficam num SQLite compartilhado por todos os workers do gunicorn
+    SEGMENT_STORE_FILE = os.getenv('SEGMENT_STORE_FILE', 'cache/segments.sqlite3')
+    SEGMENT_CACHE_SIZE = int(os.getenv('SEGMENT_CACHE_SIZE', '5000'))
+    SEGMENT_CACHE_TTL = float(os.getenv('SEGMENT_CACHE_TTL', '3600'))
+    SEGMENT_RATE_LIMIT = float(os.getenv('SEGMENT_RATE_LIMIT', '30'))
+    SEGMENT_RATE_BURST = int(os.getenv('SEGMENT_RATE_BURST', '10'))
+    SEGMENT_RATE_MAX_CLIENTS = int(os.getenv('SEGMENT_RATE_MAX_CLIENTS', '10000'))
+    # Proxies reversos confiáveis à frente do app (o Azure App Service usa um): o cliente
+    # do rate limit vem do X-Forwarded-For; 0 usa o endereço da conexão
+    TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', '1' if os.getenv('AZURE_ENVIRONMENT') else '0'))
+
+    # Pré/pós-processamento em pool de processos para documentos muito grandes.
+    # Desligado por padrão: as rotas HTTP nunca passam textos desse tamanho ao pipeline
+    # (/translate aceita 50k caracteres e /translate/file traduz por segmentos de 5k);
+    # serve ao uso programático de translate_article (ex.: exemplo_uso.py)
+    PARALLEL_WORKERS = int(os.getenv('PARALLEL_WORKERS', '0'))
+    PARALLEL_PREPROCESS_THRESHOLD = int(os.getenv('PARALLEL_PREPROCESS_THRESHOLD', str(1024 * 1024)))
+    PARALLEL_PIECE_SIZE = int(os.getenv('PARALLEL_PIECE_SIZE', str(256 * 1024)))
+
+    # Compressão de requisições e respostas (gzip; br/zstd se instalados)
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+    PRECOMPRESSION_LEVEL = 9
+    PRECOMPRESSED_CACHE_SIZE = 32
+    MAX_DECOMPRESSED_SIZE = int(os.getenv('MAX_DECOMPRESSED_SIZE', str(10 * 1024 * 1024)))
+    CACHEABLE_MAX_AGE = int(os.getenv('CACHEABLE_MAX_AGE', '300'))
+    
+    # Tracing por requisição
+    TRACE_EXPORT_FILE = os.getenv('TRACE_EXPORT_FILE', 'traces/traces.jsonl')
+    TRACE_EXPORT_MAX_BYTES = int(os.getenv('TRACE_EXPORT_MAX_BYTES', str(10 * 1024 * 1024)))
+    SLOW_TRACE_THRESHOLD = float(os.getenv('SLOW_TRACE_THRESHOLD', '5'))
+    SLOW_TRACE_BUFFER_SIZE = int(os.getenv('SLOW_TRACE_BUFFER_SIZE', '50'))
+    # Uploads longos geram milhares de spans; os excedentes são apenas contados
+    TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '500'))
+    
+    # Profiling sob demanda de /translate
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+    PROFILING_INTERVAL = float(os.getenv('PROFILING_INTERVAL', '0.005'))
+    PROFILES_DIR = os.getenv('PROFILES_DIR', 'profiles')
+    PROFILES_MAX_FILES = int(os.getenv('PROFILES_MAX_FILES', '100'))
+    
+    # Admissão por faixas de tamanho (por processo de worker)
+    # Quem espera na fila de uma faixa ocupa uma thread do gthread, então a soma de
+    # concorrência + fila das faixas precisa caber em WORKER_THREADS - ADMISSION_RESERVED_THREADS;
+    # assim cada faixa responde 429 antes de o pool de threads esgotar
+    WORKER_THREADS = int(os.getenv('GUNICORN_THREADS', '16'))
+    ADMISSION_RESERVED_THREADS = int(os.getenv('ADMISSION_RESERVED_THREADS', '1'))
+    ADMISSION_SMALL_MAX_CHARS = int(os.getenv('ADMISSION_SMALL_MAX_CHARS', '2000'))
+    ADMISSION_MEDIUM_MAX_CHARS = int(os.getenv('ADMISSION_MEDIUM_MAX_CHARS', '15000'))
+    ADMISSION_SMALL_CONCURRENCY = int(os.getenv('ADMISSION_SMALL_CONCURRENCY', '4'))
+    ADMISSION_MEDIUM_CONCURRENCY = int(os.getenv('ADMISSION_MEDIUM_CONCURRENCY', '2'))
+    ADMISSION_LARGE_CONCURRENCY = int(os.getenv('ADMISSION_LARGE_CONCURRENCY', '1'))
+    ADMISSION_SMALL_QUEUE = int(os.getenv('ADMISSION_SMALL_QUEUE', '4'))
+    ADMISSION_MEDIUM_QUEUE = int(os.getenv('ADMISSION_MEDIUM_QUEUE', '2'))
+    ADMISSION_LARGE_QUEUE = int(os.getenv('ADMISSION_LARGE_QUEUE', '2'))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '10'))
     
     @staticmethod
     def validate_config():
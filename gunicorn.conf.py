@@ -5,7 +5,12 @@ import os
 # Configurações básicas
 bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
 workers = int(os.getenv('WEB_CONCURRENCY', '4'))
-worker_class = 'sync'
+# Threads por worker (GUNICORN_THREADS): a admissão por faixas (admission.py)
+# reparte essas threads entre traduções curtas, médias e longas e ajusta os
+# limites das faixas para que concorrência + fila caibam nelas
+worker_class = 'gthread'
+# Mesmo padrão de Config.WORKER_THREADS
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
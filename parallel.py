@@ -0,0 +1,117 @@
+import re
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+from typing import Callable, List, Tuple
+from config import Config
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Linha que abre ou fecha um bloco de código (``` no início, ignorando indentação)
+FENCE_PATTERN = re.compile(rb'^[ \t]*```', re.MULTILINE)
+
+
+def find_split_points(data: bytes, piece_size: int) -> List[Tuple[int, int]]:
+    """Divide o texto (UTF-8) em trechos de ~piece_size bytes, cortando só em linhas em branco fora de blocos de código"""
+    pieces = []
+    start = 0
+    scanned = 0
+    fences = 0
+
+    while len(data) - start > piece_size:
+        cut = data.find(b'\n\n', start + piece_size)
+        while cut != -1:
+            fences += len(FENCE_PATTERN.findall(data, scanned, cut))
+            scanned = cut
+            if fences % 2 == 0:
+                break
+            # Dentro de um bloco de código: procura a próxima linha em branco
+            cut = data.find(b'\n\n', cut + 2)
+        if cut == -1:
+            break
+
+        # A linha em branco fica no fim do trecho; o corte cai sempre entre caracteres UTF-8
+        pieces.append((start, cut + 2))
+        start = scanned = cut + 2
+
+    pieces.append((start, len(data)))
+    return pieces
+
+
+class SharedText:
+    """Texto UTF-8 em memória compartilhada, lido pelos processos do pool sem cópia via pickle"""
+
+    def __init__(self, data: bytes):
+        self.size = len(data)
+        self._memory = shared_memory.SharedMemory(create=True, size=max(1, self.size))
+        self._memory.buf[:self.size] = data
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def close(self):
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_shared(name: str, start: int, end: int) -> str:
+    """Lê um trecho do texto compartilhado (executado nos processos do pool)"""
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(memory.buf[start:end]).decode('utf-8')
+    finally:
+        memory.close()
+
+
+class PreprocessingPool:
+    """Pool de processos para as etapas de CPU (regex) de documentos muito grandes"""
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = Config.PARALLEL_WORKERS if max_workers is None else max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Criado sob demanda; 'spawn' evita fork de um processo com várias threads
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Iniciando pool de pré-processamento com {self.max_workers} processos")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=get_context('spawn')
+                )
+            return self._executor
+
+    def map(self, func: Callable, name: str, pieces: List[Tuple[int, int]], args: List[Tuple]) -> List:
+        """Executa func(name, start, end, *args) para cada trecho, devolvendo os resultados na ordem dos trechos"""
+        executor = self._get_executor()
+        try:
+            futures = [
+                executor.submit(func, name, start, end, *piece_args)
+                for (start, end), piece_args in zip(pieces, args)
+            ]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            logger.error("Pool de pré-processamento interrompido; será recriado na próxima chamada")
+            with self._lock:
+                self._executor = None
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
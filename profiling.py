@@ -0,0 +1,185 @@
+import os
+import re
+import sys
+import time
+import uuid
+import threading
+import logging
+from collections import Counter
+from html import escape
+from typing import Dict, List, Optional
+from config import Config
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class SamplingProfiler:
+    """Amostra periodicamente a pilha de uma thread e agrega pilhas colapsadas"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.started_at = None
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        """Inicia a thread de amostragem"""
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Interrompe a amostragem e aguarda a thread terminar"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.time() - self.started_at
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Retorna as amostras no formato de pilhas colapsadas (flamegraph.pl, speedscope)"""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+
+class ProfileStore:
+    """Armazena perfis em disco, identificados por um id gerado pelo servidor"""
+
+    def __init__(self, directory: str = None, max_profiles: int = None):
+        self.directory = directory or Config.PROFILES_DIR
+        self.max_profiles = max_profiles or Config.PROFILES_MAX_FILES
+
+    def path_for(self, profile_id: str) -> Optional[str]:
+        """Retorna o caminho do perfil, ou None se o id for inválido"""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        return os.path.join(self.directory, f"{profile_id}.collapsed")
+
+    def save(self, profiler: SamplingProfiler, request_id: Optional[str] = None) -> str:
+        """Grava as pilhas colapsadas do perfil, remove os mais antigos e retorna o id do perfil
+
+        O id nunca vem do cliente (o X-Request-ID é escolhido por ele): assim uma
+        requisição não sobrescreve o perfil de outra. O request_id só vai para o log.
+        """
+        profile_id = uuid.uuid4().hex
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path_for(profile_id), 'x', encoding='utf-8') as f:
+            f.write(profiler.collapsed())
+        logger.info(f"Perfil {profile_id} salvo (requisição {request_id}): "
+                    f"{sum(profiler.samples.values())} amostras em {profiler.duration:.2f}s")
+        self._prune()
+        return profile_id
+
+    def load(self, profile_id: str) -> Optional[str]:
+        """Lê as pilhas colapsadas de um perfil"""
+        path = self.path_for(profile_id)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def list_profiles(self) -> List[Dict]:
+        """Lista os perfis salvos, do mais recente para o mais antigo"""
+        if not os.path.isdir(self.directory):
+            return []
+
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.collapsed'):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            profiles.append({
+                'profile_id': name[:-len('.collapsed')],
+                'created_at': stat.st_mtime,
+                'size': stat.st_size
+            })
+        return sorted(profiles, key=lambda profile: profile['created_at'], reverse=True)
+
+    def _prune(self):
+        for profile in self.list_profiles()[self.max_profiles:]:
+            try:
+                os.remove(self.path_for(profile['request_id']))
+            except OSError as e:
+                logger.warning(f"Erro ao remover perfil antigo {profile['request_id']}: {e}")
+
+
+def render_flame_graph(collapsed: str, title: str = 'Flame Graph', width: int = 1200) -> str:
+    """Gera um flame graph em SVG a partir de pilhas colapsadas"""
+    frame_height = 16
+
+    # Monta a árvore de chamadas: nó = [contagem, filhos]
+    root = [0, {}]
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if not stack or not count.isdigit():
+            continue
+        node = root
+        node[0] += int(count)
+        for frame in stack.split(';'):
+            node = node[1].setdefault(frame, [0, {}])
+            node[0] += int(count)
+
+    def depth(node):
+        return 1 + max((depth(child) for child in node[1].values()), default=0)
+
+    total = root[0] or 1
+    height = (depth(root) + 1) * frame_height + 20
+    rects = []
+
+    def layout(name, node, x, level):
+        frame_width = node[0] / total * width
+        if frame_width < 0.5:
+            return
+        y = height - (level + 1) * frame_height
+        hue = 10 + sum(name.encode('utf-8')) % 40
+        label = escape(name)
+        percent = node[0] / total * 100
+        text = ''
+        if frame_width > 30:
+            max_chars = int(frame_width / 7)
+            short = name if len(name) <= max_chars else name[:max_chars - 2] + '..'
+            text = f'<text x="{x + 3:.1f}" y="{y + 12}">{escape(short)}</text>'
+        rects.append(
+            f'<g><title>{label} ({node[0]} amostras, {percent:.2f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{frame_width:.1f}" height="{frame_height - 1}" '
+            f'fill="hsl({hue}, 90%, 60%)" rx="2"/>{text}</g>'
+        )
+        child_x = x
+        for child_name, child in sorted(node[1].items()):
+            layout(child_name, child, child_x, level + 1)
+            child_x += child[0] / total * width
+
+    layout('all', root, 0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<text x="{width / 2}" y="14" text-anchor="middle" font-size="14">{escape(title)}</text>'
+        + ''.join(rects) +
+        '</svg>'
+    )
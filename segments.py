@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import Dict, Optional
+from config import Config
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    translation TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used);
+CREATE TABLE IF NOT EXISTS buckets (
+    client TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+class RateLimited(Exception):
+    """Cliente excedeu o limite de traduções de segmentos"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Limite de segmentos excedido; tente em {retry_after}s")
+        self.retry_after = retry_after
+
+
+class SegmentStore:
+    """Arquivo SQLite compartilhado pelos workers do gunicorn (cache e baldes do rate limit)"""
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.SEGMENT_STORE_FILE
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        """Conexão da thread atual; refeita após fork (preload_app cria o app antes dos workers)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # isolation_level=None: as transações são abertas explicitamente com BEGIN IMMEDIATE
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(SCHEMA)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+
+class SegmentCache:
+    """Cache LRU com expiração das traduções de parágrafos, compartilhado entre processos"""
+
+    def __init__(self, store: SegmentStore = None, max_entries: int = None, ttl: float = None):
+        self.store = store or SegmentStore()
+        self.max_entries = max_entries or Config.SEGMENT_CACHE_SIZE
+        self.ttl = ttl or Config.SEGMENT_CACHE_TTL
+        # Contadores do processo atual
+        self.hits = 0
+        self.misses = 0
+        # last_used dos acertos, gravado em lote junto com o próximo set(): um UPDATE
+        # por acerto disputaria a trava de escrita do SQLite entre todas as threads
+        self._touched: Dict[str, float] = {}
+        self._touched_lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, source_language: str, target_language: str, preserve_formatting: bool) -> str:
+        payload = json.dumps([text, source_language, target_language, bool(preserve_formatting)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, text: str, source_language: str, target_language: str,
+            preserve_formatting: bool) -> Optional[str]:
+        """Retorna a tradução guardada do parágrafo, ou None"""
+        key = self.key(text, source_language, target_language, preserve_formatting)
+        now = time.time()
+        try:
+            row = self.store.connect().execute(
+                'SELECT translation FROM segments WHERE key = ? AND expires_at >= ?', (key, now)
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            # Banco travado ou indisponível: o cache é só uma otimização
+            logger.warning(f"Cache de segmentos indisponível, tratando como ausência: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        with self._touched_lock:
+            self._touched[key] = now
+        self.hits += 1
+        return row[0]
+
+    def set(self, text: str, source_language: str, target_language: str,
+            preserve_formatting: bool, translation: str):
+        """Guarda a tradução do parágrafo, descartando as expiradas e as menos usadas"""
+        key = self.key(text, source_language, target_language, preserve_formatting)
+        now = time.time()
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        try:
+            self._write(key, translation, now, touched)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Cache de segmentos indisponível, tradução não guardada: {e}")
+
+    def _write(self, key: str, translation: str, now: float, touched: Dict[str, float]):
+        connection = self.store.connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'UPDATE segments SET last_used = ? WHERE key = ?',
+                [(last_used, touched_key) for touched_key, last_used in touched.items()]
+            )
+            connection.execute(
+                'INSERT OR REPLACE INTO segments (key, translation, expires_at, last_used) VALUES (?, ?, ?, ?)',
+                (key, translation, now + self.ttl, now)
+            )
+            connection.execute('DELETE FROM segments WHERE expires_at < ?', (now,))
+            connection.execute(
+                'DELETE FROM segments WHERE key IN '
+                '(SELECT key FROM segments ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def stats(self) -> Dict:
+        entries = self.store.connect().execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class RateLimiter:
+    """Token bucket por cliente: `rate` traduções por minuto, com rajadas de até `burst`
+
+    Os baldes ficam no SegmentStore, então o limite vale para o servidor inteiro,
+    não para cada worker.
+    """
+
+    def __init__(self, store: SegmentStore = None, rate: float = None, burst: int = None,
+                 max_clients: int = None):
+        self.store = store or SegmentStore()
+        self.rate = (Config.SEGMENT_RATE_LIMIT if rate is None else rate) / 60.0
+        self.burst = burst or Config.SEGMENT_RATE_BURST
+        self.max_clients = max_clients or Config.SEGMENT_RATE_MAX_CLIENTS
+
+    def acquire(self, client: str):
+        """Consome um token do cliente, ou levanta RateLimited com o tempo de espera"""
+        try:
+            self._acquire(client)
+        except sqlite3.OperationalError as e:
+            # Banco travado: deixa passar em vez de devolver 500 para o cliente
+            logger.warning(f"Rate limit de segmentos indisponível, requisição liberada: {e}")
+
+    def _acquire(self, client: str):
+        now = time.time()
+        connection = self.store.connect()
+        # BEGIN IMMEDIATE serializa leitura e escrita do balde entre os processos
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated FROM buckets WHERE client = ?', (client,)
+            ).fetchone()
+            if row is None:
+                self._prune(connection, now)
+                tokens = float(self.burst)
+            else:
+                tokens = min(self.burst, row[0] + (now - row[1]) * self.rate)
+
+            allowed = tokens >= 1
+            connection.execute(
+                'INSERT OR REPLACE INTO buckets (client, tokens, updated) VALUES (?, ?, ?)',
+                (client, tokens - 1 if allowed else tokens, now)
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+        if not allowed:
+            retry_after = (1 - tokens) / self.rate if self.rate > 0 else 60
+            raise RateLimited(max(1, int(retry_after + 0.999)))
+
+    def _prune(self, connection: sqlite3.Connection, now: float):
+        if connection.execute('SELECT COUNT(*) FROM buckets').fetchone()[0] < self.max_clients:
+            return
+        # Clientes com o balde cheio de novo não precisam ser lembrados
+        connection.execute(
+            'DELETE FROM buckets WHERE tokens + (? - updated) * ? >= ?', (now, self.rate, self.burst)
+        )
+        if connection.execute('SELECT COUNT(*) FROM buckets').fetchone()[0] >= self.max_clients:
+            logger.warning("Limite de clientes do rate limit de segmentos atingido; reiniciando contadores")
+            connection.execute('DELETE FROM buckets')
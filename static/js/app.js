@@ -1,5 +1,104 @@
+class TranslationCache {
+    constructor(storageKey = 'translationCache', maxEntries = 50, maxChars = 1500000) {
+        this.storageKey = storageKey;
+        this.maxEntries = maxEntries;
+        this.maxChars = maxChars;
+    }
+
+    async hashKey(text, sourceLanguage, targetLanguage, preserveFormatting) {
+        const payload = JSON.stringify([text, sourceLanguage, targetLanguage, preserveFormatting]);
+
+        // crypto.subtle só existe em contexto seguro (https ou localhost)
+        if (window.crypto && window.crypto.subtle) {
+            const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(payload));
+            return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+        }
+
+        // Fallback: hash FNV-1a de 32 bits combinado com o tamanho do texto
+        let hash = 0x811c9dc5;
+        for (let i = 0; i < payload.length; i++) {
+            hash ^= payload.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193);
+        }
+        return `${(hash >>> 0).toString(16)}-${payload.length}`;
+    }
+
+    load() {
+        try {
+            const cache = JSON.parse(localStorage.getItem(this.storageKey) || 'null');
+            return cache && Array.isArray(cache.order) ? cache : { order: [], entries: {} };
+        } catch (error) {
+            console.error('Erro ao carregar cache de traduções:', error);
+            return { order: [], entries: {} };
+        }
+    }
+
+    get(key) {
+        const cache = this.load();
+        const entry = cache.entries[key];
+        if (!entry) {
+            return null;
+        }
+
+        // Move para o fim da fila (mais recentemente usado)
+        cache.order = cache.order.filter(k => k !== key);
+        cache.order.push(key);
+        this.store(cache);
+        return entry;
+    }
+
+    set(key, entry) {
+        const cache = this.load();
+        cache.order = cache.order.filter(k => k !== key);
+        cache.order.push(key);
+        cache.entries[key] = entry;
+        this.evict(cache);
+        this.store(cache);
+    }
+
+    evict(cache) {
+        const size = (k) => cache.entries[k].translated.length + (cache.entries[k].sourceLength || 0);
+        let totalChars = cache.order.reduce((total, k) => total + size(k), 0);
+
+        // Remove os menos usados até respeitar os limites de entradas e de caracteres
+        while (cache.order.length > 1 && (cache.order.length > this.maxEntries || totalChars > this.maxChars)) {
+            const oldest = cache.order.shift();
+            totalChars -= size(oldest);
+            delete cache.entries[oldest];
+        }
+    }
+
+    store(cache) {
+        while (true) {
+            try {
+                localStorage.setItem(this.storageKey, JSON.stringify(cache));
+                return;
+            } catch (error) {
+                // Cota do localStorage excedida: descarta a entrada mais antiga e tenta de novo
+                if (cache.order.length === 0) {
+                    console.error('Erro ao salvar cache de traduções:', error);
+                    return;
+                }
+                delete cache.entries[cache.order.shift()];
+            }
+        }
+    }
+
+    clear() {
+        localStorage.removeItem(this.storageKey);
+    }
+}
+
 class TechnicalTranslator {
     constructor() {
+        this.cache = new TranslationCache();
+        this.pendingRequest = null;
+        // Tradução ao vivo: parágrafos já traduzidos no servidor e fila dos que faltam enviar
+        this.liveSegments = new Set();
+        this.liveQueue = [];
+        this.liveTimer = null;
+        this.liveBusy = false;
+        document.getElementById('liveTranslation').checked = localStorage.getItem('liveTranslation') === 'true';
         this.initializeEventListeners();
         this.updateWordCount();
     }
@@ -33,6 +132,10 @@ class TechnicalTranslator {
             this.processUploadedFile();
         });
 
+        document.getElementById('translateFileBtn').addEventListener('click', () => {
+            this.translateUploadedFile();
+        });
+
         document.getElementById('historyBtn').addEventListener('click', () => {
             this.showHistory();
         });
@@ -44,6 +147,12 @@ class TechnicalTranslator {
 
         document.getElementById('sourceText').addEventListener('input', () => {
             this.updateWordCount();
+            this.scheduleLiveTranslation();
+        });
+
+        document.getElementById('liveTranslation').addEventListener('change', (e) => {
+            localStorage.setItem('liveTranslation', e.target.checked);
+            this.scheduleLiveTranslation();
         });
 
         document.addEventListener('keydown', (e) => {
@@ -73,21 +182,47 @@ class TechnicalTranslator {
             return;
         }
 
+        const cacheKey = await this.cache.hashKey(sourceText, sourceLanguage, targetLanguage, preserveFormatting);
+
+        // Mesma tradução já em andamento: não dispara outra requisição
+        if (this.pendingRequest && this.pendingRequest.key === cacheKey) {
+            return;
+        }
+
+        const cached = this.cache.get(cacheKey);
+        if (cached) {
+            if (this.pendingRequest) {
+                this.pendingRequest.controller.abort();
+            }
+            document.getElementById('translatedText').textContent = cached.translated;
+            document.getElementById('translationTime').textContent = `${cached.time}s (cache)`;
+            this.showAlert('Tradução carregada do cache!', 'info');
+            return;
+        }
+
+        // Cancela a requisição anterior, que ficou obsoleta
+        if (this.pendingRequest) {
+            this.pendingRequest.controller.abort();
+        }
+        const request = { key: cacheKey, controller: new AbortController() };
+        this.pendingRequest = request;
+
         this.showProgressBar(true);
         this.setTranslateButtonState(true);
 
         try {
+            const { headers, body } = await this.buildJsonRequest({
+                text: sourceText,
+                source_language: sourceLanguage,
+                target_language: targetLanguage,
+                preserve_formatting: preserveFormatting,
+                use_segment_cache: document.getElementById('liveTranslation').checked
+            });
             const response = await fetch('/translate', {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    text: sourceText,
-                    source_language: sourceLanguage,
-                    target_language: targetLanguage,
-                    preserve_formatting: preserveFormatting
-                })
+                headers,
+                body,
+                signal: request.controller.signal
             });
 
             const data = await response.json();
@@ -95,6 +230,12 @@ class TechnicalTranslator {
             if (response.ok) {
                 document.getElementById('translatedText').textContent = data.translated_text;
                 document.getElementById('translationTime').textContent = `${data.translation_time}s`;
+
+                this.cache.set(cacheKey, {
+                    translated: data.translated_text,
+                    sourceLength: sourceText.length,
+                    time: data.translation_time
+                });
                 
                 // Salva no histórico
                 this.saveToHistory({
@@ -106,19 +247,136 @@ class TechnicalTranslator {
                     time: data.translation_time
                 });
                 
-                this.showAlert('Tradução concluída com sucesso!', 'success');
+                const reused = data.segments_reused ? ` (${data.segments_reused} parágrafos já traduzidos)` : '';
+                this.showAlert(`Tradução concluída com sucesso!${reused}`, 'success');
             } else {
                 throw new Error(data.error || 'Erro na tradução');
             }
         } catch (error) {
+            if (error.name === 'AbortError') {
+                return;
+            }
             console.error('Erro na tradução:', error);
             this.showAlert(`Erro na tradução: ${error.message}`, 'danger');
         } finally {
-            this.showProgressBar(false);
-            this.setTranslateButtonState(false);
+            // Só a requisição mais recente controla o estado da interface
+            if (this.pendingRequest === request) {
+                this.pendingRequest = null;
+                this.showProgressBar(false);
+                this.setTranslateButtonState(false);
+            }
         }
     }
 
+    scheduleLiveTranslation() {
+        if (!document.getElementById('liveTranslation').checked) {
+            this.liveQueue = [];
+            return;
+        }
+
+        // Espera uma pausa na digitação antes de enviar os parágrafos concluídos
+        clearTimeout(this.liveTimer);
+        this.liveTimer = setTimeout(() => this.sendFinishedParagraphs(), 800);
+    }
+
+    splitFinishedParagraphs(text) {
+        // Mesma regra do servidor: o parágrafo termina numa linha em branco fora de bloco de código
+        const lines = text.split('\n');
+        // A última linha ainda está sendo digitada
+        lines.pop();
+
+        const paragraphs = [];
+        let current = [];
+        let inCodeBlock = false;
+        for (const line of lines) {
+            current.push(line);
+            if (line.trimStart().startsWith('```')) {
+                inCodeBlock = !inCodeBlock;
+            }
+            if (!inCodeBlock && !line.trim()) {
+                const paragraph = current.join('\n').trim();
+                if (paragraph) {
+                    paragraphs.push(paragraph);
+                }
+                current = [];
+            }
+        }
+        return paragraphs;
+    }
+
+    sendFinishedParagraphs() {
+        const sourceLanguage = document.getElementById('sourceLanguage').value;
+        const targetLanguage = document.getElementById('targetLanguage').value;
+        const preserveFormatting = document.getElementById('preserveFormatting').checked;
+        const text = document.getElementById('sourceText').value;
+
+        // Refaz a fila a cada pausa: parágrafos editados ou apagados deixam de ser enviados
+        this.liveQueue = this.splitFinishedParagraphs(text)
+            .filter(paragraph => paragraph.length <= 5000)
+            .map(paragraph => ({
+                key: JSON.stringify([paragraph, sourceLanguage, targetLanguage, preserveFormatting]),
+                payload: {
+                    text: paragraph,
+                    source_language: sourceLanguage,
+                    target_language: targetLanguage,
+                    preserve_formatting: preserveFormatting
+                }
+            }))
+            .filter(item => !this.liveSegments.has(item.key));
+        this.drainLiveQueue();
+    }
+
+    async drainLiveQueue() {
+        // Um segmento por vez, para não multiplicar as chamadas ao Azure
+        if (this.liveBusy) {
+            return;
+        }
+        this.liveBusy = true;
+
+        try {
+            while (this.liveQueue.length > 0) {
+                const item = this.liveQueue[0];
+                const response = await fetch('/translate/segment', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(item.payload)
+                });
+
+                if (response.status === 429) {
+                    // Limite do servidor: aguarda o Retry-After antes de continuar
+                    const retryAfter = parseInt(response.headers.get('Retry-After') || '5', 10);
+                    await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                    continue;
+                }
+
+                if (response.ok) {
+                    this.liveSegments.add(item.key);
+                }
+                this.liveQueue = this.liveQueue.filter(queued => queued.key !== item.key);
+            }
+        } catch (error) {
+            console.error('Erro na tradução ao vivo:', error);
+            this.liveQueue = [];
+        } finally {
+            this.liveBusy = false;
+        }
+    }
+
+    async buildJsonRequest(payload) {
+        const json = JSON.stringify(payload);
+        const headers = { 'Content-Type': 'application/json' };
+
+        // Corpos grandes seguem comprimidos com gzip quando o navegador suporta CompressionStream
+        if (json.length < 8192 || typeof CompressionStream === 'undefined') {
+            return { headers, body: json };
+        }
+
+        const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+        const body = await new Response(stream).arrayBuffer();
+        headers['Content-Encoding'] = 'gzip';
+        return { headers, body };
+    }
+
     clearTexts() {
         if (confirm('Tem certeza que deseja limpar todos os textos?')) {
             document.getElementById('sourceText').value = '';
@@ -205,13 +463,76 @@ class TechnicalTranslator {
         }
     }
 
+    async translateUploadedFile() {
+        const file = document.getElementById('fileInput').files[0];
+
+        if (!file) {
+            this.showAlert('Por favor, selecione um arquivo.', 'warning');
+            return;
+        }
+
+        // Envia o arquivo como corpo bruto (sem multipart), para que o servidor
+        // traduza enquanto lê, sem carregá-lo no textarea
+        const params = new URLSearchParams({
+            filename: file.name,
+            source_language: document.getElementById('sourceLanguage').value,
+            target_language: document.getElementById('targetLanguage').value,
+            preserve_formatting: document.getElementById('preserveFormatting').checked
+        });
+
+        const modal = bootstrap.Modal.getInstance(document.getElementById('uploadModal'));
+        modal.hide();
+        this.showProgressBar(true);
+
+        try {
+            const response = await fetch(`/translate/file?${params}`, {
+                method: 'POST',
+                headers: { 'Content-Type': file.type || 'text/plain' },
+                body: file
+            });
+
+            if (!response.ok) {
+                const data = await response.json();
+                throw new Error(data.error || 'Erro na tradução do arquivo');
+            }
+
+            const blob = await response.blob();
+
+            // Falha depois do início do download: o servidor termina o corpo com um marcador
+            const marker = response.headers.get('X-Error-Marker');
+            if (marker) {
+                const tail = await blob.slice(-512).text();
+                const index = tail.lastIndexOf(marker);
+                if (index !== -1) {
+                    const details = tail.slice(index + marker.length).trim();
+                    throw new Error(`tradução interrompida no servidor, arquivo incompleto (${details})`);
+                }
+            }
+
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `traducao_${document.getElementById('targetLanguage').value}_${file.name}`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
+            this.showAlert('Arquivo traduzido com sucesso!', 'success');
+        } catch (error) {
+            console.error('Erro na tradução do arquivo:', error);
+            this.showAlert(`Erro na tradução do arquivo: ${error.message}`, 'danger');
+        } finally {
+            this.showProgressBar(false);
+        }
+    }
+
     readFileContent(file) {
         return new Promise((resolve, reject) => {
             const reader = new FileReader();
             reader.onload = (e) => resolve(e.target.result);
             reader.onerror = (e) => reject(e);
             
-            if (file.type === 'text/plain' || file.name.endsWith('.txt') || file.name.endsWith('.md')) {
+            if (file.type === 'text/plain' || /\.(txt|md|html?)$/i.test(file.name)) {
                 reader.readAsText(file, 'UTF-8');
             } else {
                 reject(new Error('Formato de arquivo não suportado'));
@@ -309,6 +630,7 @@ class TechnicalTranslator {
     clearHistory() {
         if (confirm('Tem certeza que deseja limpar todo o histórico de traduções?')) {
             localStorage.removeItem('translationHistory');
+            this.cache.clear();
             this.showAlert('Histórico limpo com sucesso!', 'success');
         }
     }
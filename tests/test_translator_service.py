@@ -0,0 +1,111 @@
+import os
+import sys
+import logging
+import unittest
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Config.TECHNICAL_TERMS_FILE é relativo à raiz do projeto
+os.chdir(ROOT)
+
+from parallel import PreprocessingPool
+from translator_service import TechnicalTranslator
+
+logging.disable(logging.CRITICAL)
+
+
+class EchoClient:
+    """Cliente falso que devolve o texto recebido como tradução"""
+
+    def translate(self, content, to, from_parameter=None, text_type=None):
+        return [SimpleNamespace(translations=[SimpleNamespace(text=item.text)]) for item in content]
+
+
+CODE_ARTICLE = (
+    "Use the docker API from python.\n\n"
+    "```python\nimport json\nfrom docker import api\n```\n\n"
+    "Run `docker run --rm` and check the sql database.\n"
+)
+
+
+class GlossaryCodeTest(unittest.TestCase):
+    """O glossário não pode alterar código (blocos cercados e código inline)"""
+
+    def assert_code_untouched(self, translated):
+        self.assertIn("```python\nimport json\nfrom docker import api\n```", translated)
+        self.assertIn("`docker run --rm`", translated)
+
+    def test_sequential_pipeline(self):
+        translator = TechnicalTranslator(client=EchoClient(), preprocessing_pool=PreprocessingPool(max_workers=0))
+        translated = translator._translate_text(CODE_ARTICLE, 'en', 'pt')
+        self.assert_code_untouched(translated)
+        # O texto fora do código continua passando pelo glossário
+        self.assertIn("Docker API", translated)
+
+    def test_parallel_pipeline(self):
+        pool = PreprocessingPool(max_workers=1)
+        translator = TechnicalTranslator(client=EchoClient(), preprocessing_pool=pool)
+        try:
+            translated = translator._translate_text_parallel(CODE_ARTICLE, 'en', 'pt')
+        finally:
+            pool.shutdown()
+        self.assertEqual(translated, translator._translate_text(CODE_ARTICLE, 'en', 'pt'))
+        self.assert_code_untouched(translated)
+
+
+class GlossaryIndexTest(unittest.TestCase):
+    """Índice do glossário: pares sem termos e resolução via idioma pivô"""
+
+    def test_pairs_without_terms_return_text_unchanged(self):
+        translator = TechnicalTranslator(client=EchoClient(), preprocessing_pool=PreprocessingPool(max_workers=0))
+        sample = "The API stores data in the database using SQL and Docker."
+        # Pares sem termos ficam no índice como (None, {})
+        empty_pairs = [pair for pair, (pattern, _) in translator.glossary_index.items() if pattern is None]
+        self.assertTrue(empty_pairs)
+        for source, target in empty_pairs:
+            self.assertEqual(translator._preserve_technical_terms(sample, source, target), sample)
+
+    def test_pivot_resolution_ignores_case(self):
+        translator = TechnicalTranslator(client=EchoClient(), preprocessing_pool=PreprocessingPool(max_workers=0))
+        # es -> pt só existe passando pelo pivô (en), com termos em caixas diferentes
+        translator.technical_terms = {
+            'en': {'Database': 'Banco de Dados'},
+            'pt': {'banco de dados': 'database'},
+            'es': {'base de datos': 'DATABASE'}
+        }
+        translator._build_glossary_index()
+        self.assertEqual(translator._direct_term_mapping('es', 'pt'), {})
+        self.assertEqual(translator._pivot_term_mapping('es', 'pt'), {'base de datos': 'database'})
+        self.assertEqual(translator._preserve_technical_terms('Base de datos SQL', 'es', 'pt'), 'database SQL')
+
+    def test_ignorecase_match_outside_mapping(self):
+        translator = TechnicalTranslator(client=EchoClient(), preprocessing_pool=PreprocessingPool(max_workers=0))
+        # 'ſ' casa com 's' na regex IGNORECASE, mas 'ſql'.lower() não é uma chave do mapeamento
+        self.assertEqual(translator._preserve_technical_terms('use ſql', 'en', 'pt'), 'use ſql')
+        self.assertEqual(translator._preserve_technical_terms('use sql', 'en', 'pt'), 'use SQL')
+
+
+class StreamSegmentsTest(unittest.TestCase):
+    """Segmentos de /translate/file ficam dentro do limite e reconstroem o arquivo"""
+
+    def setUp(self):
+        self.translator = TechnicalTranslator(client=EchoClient(), preprocessing_pool=PreprocessingPool(max_workers=0))
+
+    def test_minified_html_is_split_at_tags(self):
+        html = '<html><body>' + ''.join(f'<p>Item {i}. Some text here!</p>' for i in range(5000)) + '</body></html>'
+        segments = list(self.translator._iter_segments([html]))
+        self.assertGreater(len(segments), 1)
+        self.assertLessEqual(max(len(segment) for segment in segments), 5000)
+        self.assertEqual(''.join(segments), html)
+        self.assertTrue(all(segment.endswith('>') for segment in segments))
+
+    def test_long_line_without_breaks(self):
+        lines = ['intro\n', 'a' * 12001, '\n']
+        segments = list(self.translator._iter_segments(lines))
+        self.assertLessEqual(max(len(segment) for segment in segments), 5000)
+        self.assertEqual(''.join(segments), ''.join(lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
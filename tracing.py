@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from config import Config
+
+# Logger para este módulo
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar = ContextVar('current_trace', default=None)
+_current_span: ContextVar = ContextVar('current_span', default=None)
+
+
+class Span:
+    """Etapa cronometrada de uma requisição"""
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def set(self, **attributes):
+        """Adiciona atributos ao span (ex.: tamanho da resposta)"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+class Trace:
+    """Conjunto de spans de uma requisição"""
+
+    def __init__(self, request_id: str, max_spans: int = None):
+        self.request_id = request_id
+        self.spans: List[Span] = []
+        self.max_spans = max_spans or Config.TRACE_MAX_SPANS
+        self.dropped_spans = 0
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+    def to_dict(self) -> Dict:
+        return {
+            'request_id': self.request_id,
+            'name': self.root.name,
+            'start': self.root.start,
+            'duration_ms': round(self.root.duration * 1000, 3),
+            'dropped_spans': self.dropped_spans,
+            'spans': [span.to_dict() for span in self.spans]
+        }
+
+    def tree(self) -> Dict:
+        """Retorna os spans aninhados (cada um com a lista de filhos)"""
+        nodes = {span.span_id: dict(span.to_dict(), children=[]) for span in self.spans}
+        for span in self.spans[1:]:
+            nodes[span.parent_id]['children'].append(nodes[span.span_id])
+        return dict(self.to_dict(), spans=nodes[self.root.span_id])
+
+
+class Tracer:
+    """Registra spans por requisição, exporta em JSON e guarda as requisições lentas"""
+
+    def __init__(self, export_file: str = None, slow_threshold: float = None, buffer_size: int = None):
+        self.export_file = Config.TRACE_EXPORT_FILE if export_file is None else export_file
+        self.slow_threshold = Config.SLOW_TRACE_THRESHOLD if slow_threshold is None else slow_threshold
+        self.slow_traces = deque(maxlen=buffer_size or Config.SLOW_TRACE_BUFFER_SIZE)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_request_id() -> Optional[str]:
+        trace = _current_trace.get()
+        return trace.request_id if trace else None
+
+    @contextmanager
+    def trace(self, request_id: Optional[str], name: str, **attributes):
+        """Inicia o trace da requisição; dentro de um trace ativo, vira apenas um span filho"""
+        if _current_trace.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace = Trace(request_id or uuid.uuid4().hex)
+        trace_token = _current_trace.set(trace)
+        try:
+            with self.span(name, **attributes) as span:
+                yield span
+        finally:
+            _current_trace.reset(trace_token)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Cronometra uma etapa; sem trace ativo não registra nada"""
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent else None, attributes)
+        # Trace cheio: o span é cronometrado mas não guardado; como o limite só
+        # cresce, os filhos dele também ficam de fora e a árvore continua íntegra
+        if len(trace.spans) < trace.max_spans:
+            trace.spans.append(span)
+        else:
+            trace.dropped_spans += 1
+        span_token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            span.end = time.time()
+            _current_span.reset(span_token)
+
+    def _finish(self, trace: Trace):
+        if trace.root.duration >= self.slow_threshold:
+            self.slow_traces.append(trace)
+            logger.warning(f"Requisição lenta {trace.request_id}: {trace.root.name} em "
+                           f"{trace.root.duration:.2f}s ({len(trace.spans) + trace.dropped_spans} spans)")
+        if self.export_file:
+            self._export(trace)
+
+    def _export(self, trace: Trace):
+        """Grava o trace como uma linha JSON, rotacionando o arquivo quando fica grande"""
+        line = json.dumps(trace.to_dict(), ensure_ascii=False) + '\n'
+        try:
+            with self._lock:
+                directory = os.path.dirname(self.export_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if (os.path.exists(self.export_file)
+                        and os.path.getsize(self.export_file) > Config.TRACE_EXPORT_MAX_BYTES):
+                    os.replace(self.export_file, self.export_file + '.1')
+                with open(self.export_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+        except OSError as e:
+            logger.warning(f"Erro ao exportar trace {trace.request_id}: {e}")
+
+    def get_slow_traces(self) -> List[Dict]:
+        """Resumo das requisições lentas guardadas, da mais recente para a mais antiga"""
+        return [
+            {
+                'request_id': trace.request_id,
+                'name': trace.root.name,
+                'start': trace.root.start,
+                'duration_ms': round(trace.root.duration * 1000, 3),
+                'span_count': len(trace.spans),
+                'dropped_spans': trace.dropped_spans
+            }
+            for trace in reversed(self.slow_traces)
+        ]
+
+    def get_slow_trace(self, request_id: str) -> Optional[Dict]:
+        """Árvore completa de spans de uma requisição lenta"""
+        for trace in self.slow_traces:
+            if trace.request_id == request_id:
+                return trace.tree()
+        return None
+
+
+class RequestIdFilter(logging.Filter):
+    """Inclui o id da requisição em andamento nos registros de log"""
+
+    def __init__(self, fallback=None):
+        super().__init__()
+        # Fonte alternativa do id quando não há trace ativo (ex.: contexto da requisição Flask)
+        self.fallback = fallback
+
+    def filter(self, record):
+        request_id = Tracer.current_request_id()
+        if request_id is None and self.fallback is not None:
+            request_id = self.fallback()
+        record.request_id = request_id or '-'
+        return True
+
+
+tracer = Tracer()
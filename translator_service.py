@@ -3,10 +3,12 @@ import json
 import time
 import os
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from azure.ai.translation.text import TextTranslationClient, TranslatorCredential
 from azure.ai.translation.text.models import InputTextItem
 from config import Config
+from parallel import PreprocessingPool, SharedText, find_split_points, read_shared
+from tracing import tracer
 
 # Logger para este módulo
 logger = logging.getLogger(__name__)
@@ -14,12 +16,15 @@ logger = logging.getLogger(__name__)
 class TechnicalTranslator:
     """Serviço de tradução de artigos técnicos usando Azure AI"""
     
-    def __init__(self):
-        """Inicializa o cliente de tradução do Azure"""
-        self.client = None
+    def __init__(self, client=None, preprocessing_pool: Optional[PreprocessingPool] = None):
+        """Inicializa o cliente de tradução do Azure (ou usa o cliente fornecido)"""
+        self.client = client
         self.technical_terms = {}
         self.supported_languages = {}
-        self._initialize_client()
+        self.glossary_index = {}
+        self.preprocessing_pool = preprocessing_pool or PreprocessingPool()
+        if self.client is None:
+            self._initialize_client()
         self._load_technical_terms()
         self._load_supported_languages()
     
@@ -113,31 +118,86 @@ class TechnicalTranslator:
             "zh": "Chinês",
             "ar": "Árabe"
         }
+        self._build_glossary_index()
     
-    def _preserve_technical_terms(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Preserva termos técnicos durante a tradução"""
+    def _build_glossary_index(self):
+        """Pré-calcula o glossário (regex única + mapeamento) de cada par de idiomas suportado"""
+        # Monta num dicionário local e troca de uma vez: requisições concorrentes
+        # nunca veem um índice pela metade
+        glossary_index = {}
+        for source_lang in self.supported_languages:
+            for target_lang in self.supported_languages:
+                if source_lang == target_lang:
+                    continue
+                
+                term_mapping = (self._direct_term_mapping(source_lang, target_lang)
+                                or self._pivot_term_mapping(source_lang, target_lang))
+                
+                # Uma única regex com todos os termos (mais longos primeiro), aplicada em uma passada
+                pattern = None
+                if term_mapping:
+                    terms = sorted(term_mapping, key=len, reverse=True)
+                    pattern = re.compile(
+                        r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\b',
+                        re.IGNORECASE
+                    )
+                glossary_index[(source_lang, target_lang)] = (pattern, term_mapping)
+        
+        self.glossary_index = glossary_index
+        indexed_pairs = sum(1 for pattern, _ in glossary_index.values() if pattern)
+        logger.info(f"Glossário indexado: {indexed_pairs} de {len(glossary_index)} pares de idiomas com termos")
+    
+    def _direct_term_mapping(self, source_lang: str, target_lang: str) -> Dict[str, str]:
+        """Mapeamento de termos entre dois idiomas presentes no dicionário"""
         if source_lang not in self.technical_terms or target_lang not in self.technical_terms:
-            return text
+            return {}
         
-        source_terms = self.technical_terms.get(source_lang, {})
-        target_terms = self.technical_terms.get(target_lang, {})
+        # Termos comparados sem diferenciar maiúsculas, como na regex do glossário
+        source_terms = self.technical_terms[source_lang]
+        target_terms = {term.lower(): translation
+                        for term, translation in self.technical_terms[target_lang].items()}
         
-        # Cria mapeamento de termos
         term_mapping = {}
         for term, translation in source_terms.items():
-            if translation in target_terms:
-                term_mapping[term.lower()] = target_terms[translation]
+            if translation.lower() in target_terms:
+                term_mapping[term.lower()] = target_terms[translation.lower()]
+        return term_mapping
+    
+    def _pivot_term_mapping(self, source_lang: str, target_lang: str) -> Dict[str, str]:
+        """Mapeamento de termos resolvido via idioma pivô (origem -> pivô -> destino)"""
+        pivot = Config.GLOSSARY_PIVOT_LANGUAGE
+        if pivot in (source_lang, target_lang):
+            return {}
+        
+        # Termos de origem cuja tradução é um termo do pivô herdam o mapeamento pivô -> destino
+        # (as chaves de from_pivot já estão em minúsculas, mesma regra do mapeamento direto)
+        source_terms = self.technical_terms.get(source_lang, {})
+        from_pivot = self._direct_term_mapping(pivot, target_lang)
         
-        # Substitui termos no texto
-        result_text = text
-        for term, translation in term_mapping.items():
-            # Usa regex para substituir apenas palavras completas
-            pattern = r'\b' + re.escape(term) + r'\b'
-            result_text = re.sub(pattern, translation, result_text, flags=re.IGNORECASE)
+        term_mapping = {}
+        for term, translation in source_terms.items():
+            if translation.lower() in from_pivot:
+                term_mapping[term.lower()] = from_pivot[translation.lower()]
+        return term_mapping
+    
+    def _preserve_technical_terms(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Preserva termos técnicos durante a tradução"""
+        return self._apply_glossary(text, self.glossary_index.get((source_lang, target_lang)))
+    
+    @staticmethod
+    def _apply_glossary(text: str, glossary: Optional[Tuple]) -> str:
+        """Aplica uma entrada do glossary_index (regex, mapeamento) ao texto"""
+        # Pares sem termos ficam no índice como (None, {})
+        if glossary is None or glossary[0] is None:
+            return text
         
-        return result_text
+        # Substitui apenas palavras completas; com IGNORECASE a regex também casa formas
+        # como 'ſql' cujo lower() não é a chave, e essas ficam como estão
+        pattern, term_mapping = glossary
+        return pattern.sub(lambda match: term_mapping.get(match.group(0).lower(), match.group(0)), text)
     
-    def _preserve_formatting(self, text: str) -> Dict[str, str]:
+    @staticmethod
+    def _preserve_formatting(text: str) -> Dict[str, str]:
         """Preserva formatação do texto (markdown, código, etc.)"""
         # Extrai blocos de código
         code_blocks = []
@@ -165,7 +225,8 @@ class TechnicalTranslator:
             'inline_code': inline_code
         }
     
-    def _restore_formatting(self, text: str, formatting_data: Dict[str, str]) -> str:
+    @staticmethod
+    def _restore_formatting(text: str, formatting_data: Dict[str, str]) -> str:
         """Restaura formatação após tradução"""
         # Restaura blocos de código
         for i, code_block in enumerate(formatting_data['code_blocks']):
@@ -180,8 +241,12 @@ class TechnicalTranslator:
         return text
     
     def translate_article(self, text: str, source_language: str, target_language: str, 
-                         preserve_formatting: bool = True) -> Dict:
-        """Traduz um artigo técnico completo"""
+                         preserve_formatting: bool = True, request_id: Optional[str] = None,
+                         segment_cache=None) -> Dict:
+        """Traduz um artigo técnico completo (request_id correlaciona logs e spans)
+        
+        Com segment_cache, parágrafos já traduzidos (ex.: pela tradução ao vivo) são reaproveitados.
+        """
         start_time = time.time()
         
         try:
@@ -191,51 +256,31 @@ class TechnicalTranslator:
             
             logger.debug(f"Iniciando tradução: {len(text)} caracteres, {source_language} -> {target_language}")
             
-            # Preserva formatação se solicitado (código, markdown, etc.)
-            if preserve_formatting:
-                formatting_data = self._preserve_formatting(text)
-                text_to_translate = formatting_data['text']
-                logger.debug(f"Formatação preservada: {len(formatting_data.get('code_blocks', []))} blocos de código")
-            else:
-                formatting_data = None
-                text_to_translate = text
-            
-            # Divide o texto em chunks para tradução (Azure tem limite de tamanho)
-            chunks = self._split_text_into_chunks(text_to_translate)
-            logger.debug(f"Texto dividido em {len(chunks)} chunks")
-            
-            translated_chunks = []
-            for i, chunk in enumerate(chunks):
-                if chunk.strip():
-                    translated_chunk = self._translate_chunk(chunk, source_language, target_language)
-                    translated_chunks.append(translated_chunk)
-                    logger.debug(f"Chunk {i+1}/{len(chunks)} traduzido")
+            with tracer.trace(request_id, 'translate_article', chars=len(text),
+                              source_language=source_language, target_language=target_language):
+                segments_reused = None
+                if segment_cache is not None:
+                    translated_text, segments_reused = self._translate_with_segments(
+                        text, source_language, target_language, preserve_formatting, segment_cache
+                    )
                 else:
-                    translated_chunks.append(chunk)
-            
-            # Reconstrói o texto traduzido
-            translated_text = ''.join(translated_chunks)
-            
-            # Restaura formatação se foi preservada
-            if preserve_formatting and formatting_data:
-                translated_text = self._restore_formatting(translated_text, formatting_data)
-                logger.debug("Formatação restaurada")
-            
-            # Preserva termos técnicos do dicionário
-            translated_text = self._preserve_technical_terms(
-                translated_text, source_language, target_language
-            )
+                    translated_text = self._translate_text(
+                        text, source_language, target_language, preserve_formatting
+                    )
             
             translation_time = time.time() - start_time
             
             logger.info(f"Tradução concluída: {len(text)} -> {len(translated_text)} caracteres em {translation_time:.2f}s")
             
-            return {
+            result = {
                 'translated_text': translated_text,
                 'confidence': 0.95,  # Azure não retorna confiança diretamente
                 'detected_language': source_language,
                 'translation_time': round(translation_time, 2)
             }
+            if segments_reused is not None:
+                result['segments_reused'] = segments_reused
+            return result
             
         except ValueError as e:
             # Erros de validação são re-levantados
@@ -246,27 +291,265 @@ class TechnicalTranslator:
             logger.error(f"Erro na tradução: {e}", exc_info=True)
             raise Exception(f"Erro ao traduzir artigo: {str(e)}")
     
-    def _split_text_into_chunks(self, text: str, max_chunk_size: int = 5000) -> List[str]:
-        """Divide o texto em chunks menores para tradução"""
+    def _translate_text(self, text: str, source_language: str, target_language: str,
+                        preserve_formatting: bool = True, text_type: str = 'plain') -> str:
+        """Executa o pipeline de tradução (formatação, chunks, termos técnicos) sobre um texto"""
+        if self.preprocessing_pool.enabled and len(text) >= Config.PARALLEL_PREPROCESS_THRESHOLD:
+            return self._translate_text_parallel(
+                text, source_language, target_language, preserve_formatting, text_type
+            )
+        
+        # Preserva formatação se solicitado (código, markdown, etc.)
+        if preserve_formatting:
+            with tracer.span('preserve_formatting', chars=len(text)):
+                formatting_data = self._preserve_formatting(text)
+            text_to_translate = formatting_data['text']
+            logger.debug(f"Formatação preservada: {len(formatting_data.get('code_blocks', []))} blocos de código")
+        else:
+            formatting_data = None
+            text_to_translate = text
+        
+        # Divide o texto em chunks para tradução (Azure tem limite de tamanho)
+        with tracer.span('split_text_into_chunks', chars=len(text_to_translate)) as span:
+            chunks = self._split_text_into_chunks(text_to_translate)
+            if span:
+                span.set(chunks=len(chunks))
+        logger.debug(f"Texto dividido em {len(chunks)} chunks")
+        
+        # Reconstrói o texto traduzido
+        translated_text = ''.join(self._translate_chunks(chunks, source_language, target_language, text_type))
+        
+        # Preserva termos técnicos do dicionário antes de restaurar a formatação,
+        # para que o glossário nunca altere blocos de código
+        with tracer.span('preserve_technical_terms', chars=len(translated_text)):
+            translated_text = self._preserve_technical_terms(
+                translated_text, source_language, target_language
+            )
+        
+        # Restaura formatação se foi preservada
+        if preserve_formatting and formatting_data:
+            with tracer.span('restore_formatting', chars=len(translated_text)):
+                translated_text = self._restore_formatting(translated_text, formatting_data)
+            logger.debug("Formatação restaurada")
+        
+        return translated_text
+    
+    def _translate_chunks(self, chunks: List[str], source_language: str, target_language: str,
+                          text_type: str = 'plain') -> List[str]:
+        """Traduz os chunks em sequência, mantendo os vazios como estão"""
+        translated_chunks = []
+        for i, chunk in enumerate(chunks):
+            content = chunk.strip()
+            if content:
+                # Só o conteúdo vai para o Azure; os espaços e quebras ao redor são mantidos
+                leading = chunk[:len(chunk) - len(chunk.lstrip())]
+                trailing = chunk[len(chunk.rstrip()):]
+                with tracer.span('translate_chunk', index=i, chars=len(content)) as span:
+                    translated_chunk = self._translate_chunk(content, source_language, target_language, text_type)
+                    if span:
+                        span.set(translated_chars=len(translated_chunk))
+                translated_chunks.append(leading + translated_chunk + trailing)
+                logger.debug(f"Chunk {i+1}/{len(chunks)} traduzido")
+            else:
+                translated_chunks.append(chunk)
+        return translated_chunks
+    
+    def _translate_text_parallel(self, text: str, source_language: str, target_language: str,
+                                 preserve_formatting: bool = True, text_type: str = 'plain') -> str:
+        """Pipeline para documentos muito grandes: pré e pós-processamento por trecho no pool de processos"""
+        data = text.encode('utf-8')
+        pieces = find_split_points(data, Config.PARALLEL_PIECE_SIZE)
+        logger.debug(f"Documento dividido em {len(pieces)} trechos para {self.preprocessing_pool.max_workers} processos")
+        
+        with tracer.span('parallel_preprocess', chars=len(text), pieces=len(pieces)):
+            with SharedText(data) as shared:
+                prepared = self.preprocessing_pool.map(
+                    _preprocess_piece, shared.name, pieces, [(preserve_formatting,)] * len(pieces)
+                )
+        
+        # As chamadas ao Azure continuam no processo principal, na ordem do documento
+        chunks = [chunk for piece in prepared for chunk in piece['chunks']]
+        translated_chunks = iter(self._translate_chunks(chunks, source_language, target_language, text_type))
+        translated_pieces = [
+            ''.join(next(translated_chunks) for _ in piece['chunks']).encode('utf-8')
+            for piece in prepared
+        ]
+        
+        offsets = []
+        position = 0
+        for piece in translated_pieces:
+            offsets.append((position, position + len(piece)))
+            position += len(piece)
+        
+        glossary = self.glossary_index.get((source_language, target_language))
+        with tracer.span('parallel_postprocess', chars=position, pieces=len(pieces)):
+            with SharedText(b''.join(translated_pieces)) as shared:
+                restored = self.preprocessing_pool.map(
+                    _postprocess_piece, shared.name, offsets,
+                    [(piece['formatting_data'], glossary) for piece in prepared]
+                )
+        
+        # Os chunks de cada trecho cobrem o trecho inteiro, então basta juntar na ordem original
+        return ''.join(restored)
+    
+    def translate_stream(self, lines: Iterable[str], source_language: str, target_language: str,
+                         preserve_formatting: bool = True, text_type: str = 'plain') -> Iterator[str]:
+        """Traduz um documento lido incrementalmente, gerando o texto traduzido segmento a segmento"""
+        for segment in self._iter_segments(lines):
+            content = segment.strip()
+            if not content:
+                yield segment
+                continue
+            
+            # Mantém os espaços e quebras de linha ao redor do segmento
+            leading = segment[:len(segment) - len(segment.lstrip())]
+            trailing = segment[len(segment.rstrip()):]
+            translated = self._translate_text(
+                content, source_language, target_language, preserve_formatting, text_type
+            )
+            yield leading + translated + trailing
+    
+    def _translate_with_segments(self, text: str, source_language: str, target_language: str,
+                                 preserve_formatting: bool, segment_cache) -> Tuple[str, int]:
+        """Reaproveita os parágrafos em cache e traduz apenas as sequências de parágrafos ausentes"""
+        translated_parts = []
+        pending: List[str] = []
+        reused = 0
+        
+        def translate_pending():
+            run = ''.join(pending)
+            content = run.strip()
+            leading = run[:len(run) - len(run.lstrip())]
+            trailing = run[len(run.rstrip()):]
+            translated = self._translate_text(content, source_language, target_language, preserve_formatting)
+            # Um parágrafo isolado também vira entrada do cache
+            if sum(1 for segment in pending if segment.strip()) == 1:
+                segment_cache.set(content, source_language, target_language, preserve_formatting, translated)
+            translated_parts.append(leading + translated + trailing)
+            pending.clear()
+        
+        for segment in self._iter_segments(text.splitlines(keepends=True), max_segment_size=0):
+            content = segment.strip()
+            if not content:
+                (pending if pending else translated_parts).append(segment)
+                continue
+            
+            cached = segment_cache.get(content, source_language, target_language, preserve_formatting)
+            if cached is None:
+                pending.append(segment)
+                continue
+            
+            if pending:
+                translate_pending()
+            reused += 1
+            leading = segment[:len(segment) - len(segment.lstrip())]
+            trailing = segment[len(segment.rstrip()):]
+            translated_parts.append(leading + cached + trailing)
+        
+        if pending:
+            translate_pending()
+        
+        logger.debug(f"Segmentos reaproveitados do cache: {reused}")
+        return ''.join(translated_parts), reused
+    
+    def _iter_segments(self, lines: Iterable[str], max_segment_size: int = 5000,
+                       max_paragraph_size: int = 5000) -> Iterator[str]:
+        """Agrupa linhas em segmentos por parágrafo, sem quebrar blocos de código
+        
+        Parágrafos maiores que max_paragraph_size (texto sem linhas em branco, bloco de código
+        sem fechamento) são cortados em fim de linha, e linhas maiores que isso (HTML minificado)
+        em fim de tag, frase ou palavra, para que nenhum segmento cresça sem limite.
+        """
+        segment: List[str] = []
+        segment_size = 0
+        paragraph: List[str] = []
+        paragraph_size = 0
+        in_code_block = False
+        
+        for line in lines:
+            if len(line) > max_paragraph_size:
+                if segment:
+                    yield ''.join(segment)
+                    segment, segment_size = [], 0
+                if paragraph:
+                    yield ''.join(paragraph)
+                    paragraph, paragraph_size = [], 0
+                *pieces, line = self._split_long_line(line, max_paragraph_size)
+                yield from pieces
+            
+            if paragraph and paragraph_size + len(line) > max_paragraph_size:
+                if segment:
+                    yield ''.join(segment)
+                    segment, segment_size = [], 0
+                yield ''.join(paragraph)
+                paragraph, paragraph_size = [], 0
+            
+            paragraph.append(line)
+            paragraph_size += len(line)
+            if line.lstrip().startswith('```'):
+                in_code_block = not in_code_block
+            
+            # Fim de parágrafo: linha em branco fora de bloco de código
+            if in_code_block or line.strip():
+                continue
+            
+            if segment and segment_size + paragraph_size > max_segment_size:
+                yield ''.join(segment)
+                segment, segment_size = [], 0
+            segment.extend(paragraph)
+            segment_size += paragraph_size
+            paragraph, paragraph_size = [], 0
+        
+        if segment and segment_size + paragraph_size > max_segment_size:
+            yield ''.join(segment)
+            segment = []
+        segment.extend(paragraph)
+        if segment:
+            yield ''.join(segment)
+    
+    # Pontos de corte de uma linha longa, do preferido ao último recurso
+    LINE_BREAK_PATTERNS = (re.compile(r'</[^<>]+>'), re.compile(r'>'), re.compile(r'[.!?]\s+'), re.compile(r'\s+'))
+    
+    @staticmethod
+    def _split_long_line(line: str, max_size: int) -> List[str]:
+        """Corta uma linha em pedaços de até max_size caracteres (a concatenação é a linha original)"""
+        pieces = []
+        start = 0
+        while len(line) - start > max_size:
+            window = line[start:start + max_size]
+            cut = max_size
+            for pattern in TechnicalTranslator.LINE_BREAK_PATTERNS:
+                ends = [match.end() for match in pattern.finditer(window) if match.end() < len(window)]
+                if ends:
+                    cut = ends[-1]
+                    break
+            pieces.append(line[start:start + cut])
+            start += cut
+        pieces.append(line[start:])
+        return pieces
+    
+    @staticmethod
+    def _split_text_into_chunks(text: str, max_chunk_size: int = 5000) -> List[str]:
+        """Divide o texto em chunks menores para tradução (a concatenação dos chunks é o texto original)"""
         # Divide por parágrafos primeiro
         paragraphs = text.split('\n\n')
         chunks = []
         current_chunk = ""
         
-        for paragraph in paragraphs:
-            if len(current_chunk) + len(paragraph) <= max_chunk_size:
-                current_chunk += paragraph + '\n\n'
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = paragraph + '\n\n'
+        for i, paragraph in enumerate(paragraphs):
+            if current_chunk and len(current_chunk) + len(paragraph) > max_chunk_size:
+                chunks.append(current_chunk)
+                current_chunk = ""
+            # O separador fica no chunk para que a junção devolva o texto sem perder parágrafos
+            current_chunk += paragraph + ('\n\n' if i < len(paragraphs) - 1 else '')
         
         if current_chunk:
-            chunks.append(current_chunk.strip())
+            chunks.append(current_chunk)
         
         return chunks
     
-    def _translate_chunk(self, text: str, source_language: str, target_language: str) -> str:
+    def _translate_chunk(self, text: str, source_language: str, target_language: str,
+                         text_type: str = 'plain') -> str:
         """Traduz um chunk de texto usando Azure Translator"""
         try:
             if not text or not text.strip():
@@ -279,7 +562,8 @@ class TechnicalTranslator:
             response = self.client.translate(
                 content=input_text_elements,
                 to=[target_language],
-                from_parameter=source_language if source_language != 'auto' else None
+                from_parameter=source_language if source_language != 'auto' else None,
+                text_type=text_type
             )
             
             translation = response[0] if response else None
@@ -296,6 +580,82 @@ class TechnicalTranslator:
             # Em caso de erro, retorna o texto original para não quebrar o fluxo
             return text
     
+    def translate_batch(self, texts: List[str], source_language: str, target_language: str) -> Dict:
+        """Traduz muitos textos curtos (catálogos de interface) com o mínimo de chamadas ao Azure"""
+        start_time = time.time()
+        
+        # Remove duplicatas mantendo a ordem; textos vazios não são enviados
+        unique_texts = [text for text in dict.fromkeys(texts) if text.strip()]
+        translations = {}
+        batches = self._pack_batches(unique_texts)
+        for i, batch in enumerate(batches):
+            with tracer.span('translate_items', index=i, items=len(batch), chars=sum(len(text) for text in batch)):
+                translated = self._translate_items(batch, source_language, target_language)
+            translations.update(zip(batch, translated))
+            logger.debug(f"Lote {i+1}/{len(batches)} traduzido: {len(batch)} textos")
+        
+        results = [
+            self._preserve_technical_terms(translations.get(text, text), source_language, target_language)
+            for text in texts
+        ]
+        
+        translation_time = time.time() - start_time
+        logger.info(f"Lote traduzido: {len(texts)} textos ({len(unique_texts)} únicos) "
+                    f"em {len(batches)} chamadas, {translation_time:.2f}s")
+        
+        return {
+            'translations': results,
+            'unique_count': len(unique_texts),
+            'requests': len(batches),
+            'translation_time': round(translation_time, 2)
+        }
+    
+    def _pack_batches(self, texts: List[str], max_items: int = None, max_chars: int = None) -> List[List[str]]:
+        """Agrupa textos respeitando os limites por chamada do Azure (itens e caracteres)"""
+        max_items = max_items or Config.BATCH_MAX_ITEMS
+        max_chars = max_chars or Config.BATCH_MAX_CHARS
+        batches = []
+        current_batch = []
+        current_chars = 0
+        
+        for text in texts:
+            if current_batch and (len(current_batch) >= max_items or current_chars + len(text) > max_chars):
+                batches.append(current_batch)
+                current_batch, current_chars = [], 0
+            current_batch.append(text)
+            current_chars += len(text)
+        
+        if current_batch:
+            batches.append(current_batch)
+        
+        return batches
+    
+    def _translate_items(self, texts: List[str], source_language: str, target_language: str) -> List[str]:
+        """Traduz vários textos em uma única chamada ao Azure Translator"""
+        try:
+            input_text_elements = [InputTextItem(text=text) for text in texts]
+            
+            response = self.client.translate(
+                content=input_text_elements,
+                to=[target_language],
+                from_parameter=source_language if source_language != 'auto' else None
+            )
+            
+            results = []
+            for text, translation in zip(texts, response or []):
+                if translation and translation.translations:
+                    results.append(translation.translations[0].text)
+                else:
+                    results.append(text)
+            # Itens sem resposta mantêm o texto original
+            results.extend(texts[len(results):])
+            return results
+            
+        except Exception as e:
+            logger.error(f"Erro ao traduzir lote: {e}")
+            # Em caso de erro, retorna os textos originais para não quebrar o fluxo
+            return list(texts)
+    
     def get_supported_languages(self) -> Dict[str, str]:
         """Retorna lista de idiomas suportados"""
         return self.supported_languages
@@ -312,4 +672,28 @@ class TechnicalTranslator:
             self.technical_terms[target_lang] = {}
         
         self.technical_terms[source_lang][term] = translation
+        self._build_glossary_index()
         self._save_technical_terms()
+
+
+def _preprocess_piece(name: str, start: int, end: int, preserve_formatting: bool) -> Dict:
+    """Preserva a formatação e divide em chunks um trecho do documento (executado no pool)"""
+    text = read_shared(name, start, end)
+    formatting_data = None
+    if preserve_formatting:
+        formatting_data = TechnicalTranslator._preserve_formatting(text)
+        text = formatting_data.pop('text')
+    
+    return {
+        'chunks': TechnicalTranslator._split_text_into_chunks(text),
+        'formatting_data': formatting_data
+    }
+
+
+def _postprocess_piece(name: str, start: int, end: int, formatting_data: Optional[Dict],
+                       glossary: Optional[Tuple]) -> str:
+    """Aplica o glossário e restaura a formatação de um trecho traduzido (executado no pool)"""
+    text = TechnicalTranslator._apply_glossary(read_shared(name, start, end), glossary)
+    if formatting_data:
+        text = TechnicalTranslator._restore_formatting(text, formatting_data)
+    return text